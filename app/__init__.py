@@ -2,7 +2,8 @@
 from flask import Flask, session
 from app.routes import register_routes
 from .config import DevelopmentConfig
-from .extensions import db, migrate
+from .utils.tokens import init_jwt
+from .extensions import db, migrate, jwt, revoked_tokens, pool_index, pool_stats, similarity_index, topic_tree, question_search, generation_jobs, paper_view_cache, course_scopes
 from datetime import timedelta
 import os
 import secrets
@@ -24,6 +25,16 @@ def create_app(config_object=None):
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
+    jwt.init_app(app)
+    init_jwt(jwt, revoked_tokens)
+    pool_index.init_app(app)
+    pool_stats.init_app(app)
+    similarity_index.init_app(app)
+    topic_tree.init_app(app)
+    question_search.init_app(app)
+    generation_jobs.init_app(app)
+    paper_view_cache.max_size = app.config.get('PAPER_VIEW_CACHE_SIZE', 512)
+    course_scopes.init_app(app)
     
     # Make sessions permanent and generate CSRF token
     @app.before_request
@@ -64,20 +75,16 @@ def create_app(config_object=None):
     from app.routes import register_routes
     register_routes(app)
 
+    from .commands import register_commands
+    register_commands(app)
+
 
     
 
     @app.context_processor
     def inject_user():
         """Make user available in all templates"""
-        from flask import session
-        user = None
-        if 'user_id' in session:
-            from .models import SuperAdmin, Faculty
-            if session.get('role') == 'super_admin':
-                user = SuperAdmin.query.get(session['user_id'])
-            else:
-                user = Faculty.query.get(session['user_id'])
-        return {'current_user': user}
+        from .utils.auth import current_principal
+        return {'current_user': current_principal().user}
 
     return app
@@ -0,0 +1,260 @@
+# app/commands.py
+import csv
+import json
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+
+questions_cli = AppGroup('questions', help="Question bank maintenance.")
+check_cli = AppGroup('check', help="Database health checks.")
+faculty_cli = AppGroup('faculty', help="Faculty account maintenance.")
+
+
+# =====================================================
+# IMPORT
+# =====================================================
+@questions_cli.command('import')
+@click.argument('course_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']),
+              help="Defaults to the file extension.")
+@click.option('--batch-size', type=int, help="Rows per INSERT.")
+def import_questions_command(course_id, path, fmt, batch_size):
+    """Stream questions for COURSE_ID from a CSV or JSONL file."""
+    from .utils.question_import import QuestionImportError, detect_format, import_questions, read_rows
+
+    with open(path, 'rb') as f:
+        try:
+            report = import_questions(
+                course_id,
+                read_rows(f, fmt or detect_format(path)),
+                batch_size=batch_size or current_app.config['QUESTION_IMPORT_BATCH_SIZE'],
+                max_errors=current_app.config['QUESTION_IMPORT_MAX_ERRORS']
+            )
+        except QuestionImportError as e:
+            raise click.ClickException(str(e))
+
+    for error in report['errors']:
+        click.echo(f"row {error['row']}: {error['msg']}", err=True)
+    if report['errors_truncated']:
+        click.echo("... more errors not shown", err=True)
+
+    click.echo(json.dumps({
+        'imported': report['imported'],
+        'failed': report['failed']
+    }))
+
+
+# =====================================================
+# EXPORT
+# =====================================================
+@questions_cli.command('export')
+@click.argument('course_id', type=int)
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True),
+              help="Defaults to stdout.")
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default='csv')
+@click.option('--gzip', 'compress', is_flag=True, help="Gzip the output.")
+@click.option('--topic-id', type=int)
+@click.option('--question-type')
+@click.option('--active/--inactive', default=None, help="Only active / inactive questions.")
+@click.option('--bloom-level')
+def export_questions_command(course_id, output, fmt, compress, topic_id,
+                             question_type, active, bloom_level):
+    """Stream the questions of COURSE_ID as CSV or JSONL."""
+    from .utils.question_export import iter_export, question_filters
+
+    filters = question_filters(
+        course_id=course_id,
+        topic_id=topic_id,
+        question_type=question_type,
+        active=active,
+        bloom_level=bloom_level
+    )
+    chunks = iter_export(
+        filters, fmt, compress,
+        batch_size=current_app.config['QUESTION_EXPORT_BATCH_SIZE']
+    )
+
+    with click.open_file(output or '-', 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+# =====================================================
+# POOL STATISTICS
+# =====================================================
+@questions_cli.command('reconcile-stats')
+@click.option('--course-id', type=int, help="Only this course (default: all).")
+@click.option('--check', is_flag=True, help="Report drift without rewriting; exit 1 if any.")
+def reconcile_stats_command(course_id, check):
+    """Rebuild the question pool statistics from tbl_questions in one pass."""
+    from .extensions import db, pool_stats
+
+    if check:
+        drift = pool_stats.drift(course_id)
+        for cell, stored, actual in drift:
+            click.echo(f"{cell}: stored {stored}, actual {actual}")
+        if drift:
+            raise click.ClickException(f"{len(drift)} pool statistics cells are out of date")
+        click.echo("Pool statistics are up to date")
+        return
+
+    cells = pool_stats.rebuild(course_id)
+    db.session.commit()
+    click.echo(json.dumps({'cells': cells}))
+
+
+# =====================================================
+# NEAR DUPLICATES
+# =====================================================
+@questions_cli.command('similarity-index')
+@click.option('--course-id', type=int, help="Only this course (default: all).")
+def similarity_index_command(course_id):
+    """Rebuild the near-duplicate index from the question texts."""
+    from .extensions import db, similarity_index
+
+    indexed = similarity_index.rebuild(course_id)
+    db.session.commit()
+    click.echo(json.dumps({'indexed': indexed}))
+
+
+@questions_cli.command('dedupe')
+@click.argument('course_id', type=int)
+@click.option('--threshold', type=float, help="Similarity from which questions are grouped.")
+@click.option('--output', '-o', type=click.Path(dir_okay=False, writable=True),
+              help="Write the clusters as JSONL (default: stdout).")
+def dedupe_command(course_id, threshold, output):
+    """Group the near-duplicate questions of COURSE_ID into clusters."""
+    from sqlalchemy import select
+    from .extensions import db, similarity_index
+    from .models import Question
+
+    clusters = similarity_index.clusters(course_id, threshold)
+
+    ids = [i for cluster in clusters for i in cluster]
+    questions = {}
+    for start in range(0, len(ids), 1000):
+        for row in db.session.execute(
+            select(Question.id, Question.topic_id, Question.active, Question.text)
+            .where(Question.id.in_(ids[start:start + 1000]))
+        ):
+            questions[row.id] = {
+                'id': row.id,
+                'topic_id': row.topic_id,
+                'active': bool(row.active),
+                'text': row.text,
+            }
+
+    with click.open_file(output or '-', 'w', encoding='utf-8') as f:
+        for cluster in clusters:
+            f.write(json.dumps({'questions': [questions[i] for i in cluster if i in questions]},
+                               ensure_ascii=False) + '\n')
+
+    click.echo(
+        f"{len(clusters)} clusters, {len(ids) - len(clusters)} questions could be removed",
+        err=True
+    )
+
+
+# =====================================================
+# FULL-TEXT SEARCH
+# =====================================================
+@questions_cli.command('search-index')
+@click.option('--course-id', type=int, help="Only this course (default: all).")
+def search_index_command(course_id):
+    """Rebuild the search documents from the question texts and options."""
+    from .extensions import db, question_search
+
+    indexed = question_search.rebuild(course_id)
+    db.session.commit()
+    click.echo(json.dumps({'indexed': indexed, 'backend': question_search.resolve_backend()}))
+
+
+# =====================================================
+# TOPIC HIERARCHY
+# =====================================================
+@questions_cli.command('topic-tree')
+@click.option('--course-id', type=int, help="Only this course (default: all).")
+def topic_tree_command(course_id):
+    """Rebuild the topic closure table from the topics' parent links."""
+    from .extensions import db, topic_tree
+
+    paths = topic_tree.rebuild(course_id)
+    db.session.commit()
+    click.echo(json.dumps({'paths': paths}))
+
+
+# =====================================================
+# FACULTY ONBOARDING
+# =====================================================
+@faculty_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--credentials', type=click.Path(dir_okay=False, writable=True),
+              help="Write generated passwords here as CSV (default: stdout).")
+@click.option('--workers', type=int, help="Password hashing processes.")
+@click.option('--batch-size', type=int, help="Accounts per INSERT.")
+def import_faculty_command(path, credentials, workers, batch_size):
+    """Create faculty accounts from a CSV of name, email, department[, password]."""
+    from .utils.faculty_import import FacultyImportError, import_faculty, read_faculty_rows
+
+    with open(path, 'rb') as f:
+        try:
+            report = import_faculty(
+                read_faculty_rows(f),
+                batch_size=batch_size or current_app.config['FACULTY_IMPORT_BATCH_SIZE'],
+                workers=workers or current_app.config['FACULTY_IMPORT_WORKERS']
+            )
+        except FacultyImportError as e:
+            raise click.ClickException(str(e))
+
+    for error in report['errors']:
+        click.echo(f"row {error['row']}: {error['msg']}", err=True)
+    if report['errors_truncated']:
+        click.echo("... more errors not shown", err=True)
+
+    if report['credentials']:
+        with click.open_file(credentials or '-', 'w', encoding='utf-8') as out:
+            writer = csv.DictWriter(out, fieldnames=['email', 'password'])
+            writer.writeheader()
+            writer.writerows(report['credentials'])
+
+    click.echo(json.dumps({
+        'imported': report['imported'],
+        'failed': report['failed']
+    }), err=bool(report['credentials']) and not credentials)
+
+
+# =====================================================
+# QUERY PLANS
+# =====================================================
+@check_cli.command('query-plans')
+def check_query_plans_command():
+    """EXPLAIN the hot queries; exit 1 if any does a full table scan."""
+    from .extensions import db
+    from .utils.query_plans import EXPLAIN_DIALECTS, check_query_plans
+
+    results = check_query_plans()
+    if results is None:
+        raise click.ClickException(
+            f"Query plans cannot be checked on {db.engine.dialect.name} "
+            f"(supported: {', '.join(EXPLAIN_DIALECTS)})"
+        )
+
+    failures = 0
+    for name, plan, full_scans in results:
+        status = 'FULL SCAN' if full_scans else 'ok'
+        click.echo(f"[{status}] {name}")
+        for table, detail, _ in plan:
+            click.echo(f"    {detail}")
+        if full_scans:
+            failures += 1
+
+    if failures:
+        raise click.ClickException(f"{failures} hot queries fall back to a full table scan")
+
+
+def register_commands(app):
+    app.cli.add_command(questions_cli)
+    app.cli.add_command(check_cli)
+    app.cli.add_command(faculty_cli)
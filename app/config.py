@@ -1,5 +1,6 @@
 # app/config.py
 import os
+from datetime import timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,6 +20,64 @@ class Config:
     # Prevent session fixation attacks
     SESSION_REFRESH_EACH_REQUEST = True
 
+    # Bearer tokens for API clients (Flask-JWT-Extended); sessions stay cookie based
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
+    JWT_TOKEN_LOCATION = ['headers']
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv('JWT_ACCESS_TOKEN_MINUTES', 15)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv('JWT_REFRESH_TOKEN_DAYS', 30)))
+
+    # In-process question pool index (see app/utils/pool_index.py)
+    QUESTION_POOL_INDEX_MAX_COURSES = int(os.getenv('QUESTION_POOL_INDEX_MAX_COURSES', 256))
+    QUESTION_POOL_INDEX_TTL = int(os.getenv('QUESTION_POOL_INDEX_TTL', 300))
+
+    # Batch (Set A/B/C...) paper generation
+    PAPER_VARIANT_MAX_COUNT = int(os.getenv('PAPER_VARIANT_MAX_COUNT', 52))
+
+    # Constrained selection (Bloom targets come from Template.bloom_distribution);
+    # difficulty band as "low,high", unset = no band
+    PAPER_DIFFICULTY_BAND = tuple(
+        float(v) for v in os.getenv('PAPER_DIFFICULTY_BAND', '').split(',') if v.strip()
+    ) or None
+    PAPER_MIN_CO_SHARE = float(os.getenv('PAPER_MIN_CO_SHARE', 0))
+    PAPER_SOLVER_TIME_BUDGET = float(os.getenv('PAPER_SOLVER_TIME_BUDGET', 0.2))
+
+    # Skip questions used in the last K papers of a course when the pool allows
+    QUESTION_EXPOSURE_EXCLUDE_LAST_K = int(os.getenv('QUESTION_EXPOSURE_EXCLUDE_LAST_K', 2))
+
+    # Generated papers kept in the per-process view cache (LRU eviction)
+    PAPER_VIEW_CACHE_SIZE = int(os.getenv('PAPER_VIEW_CACHE_SIZE', 512))
+
+    # Background generation jobs
+    GENERATION_JOB_WORKERS = int(os.getenv('GENERATION_JOB_WORKERS', 2))
+    GENERATION_JOB_STALE_SECONDS = int(os.getenv('GENERATION_JOB_STALE_SECONDS', 600))
+
+    # Bulk question import (rows per INSERT, row errors kept in the report)
+    QUESTION_IMPORT_BATCH_SIZE = int(os.getenv('QUESTION_IMPORT_BATCH_SIZE', 1000))
+    QUESTION_IMPORT_MAX_ERRORS = int(os.getenv('QUESTION_IMPORT_MAX_ERRORS', 1000))
+
+    # Rows fetched per round trip when streaming question exports
+    QUESTION_EXPORT_BATCH_SIZE = int(os.getenv('QUESTION_EXPORT_BATCH_SIZE', 1000))
+
+    # Per-user cache of the courses each user may see
+    COURSE_SCOPE_CACHE_SIZE = int(os.getenv('COURSE_SCOPE_CACHE_SIZE', 1024))
+    COURSE_SCOPE_CACHE_TTL = int(os.getenv('COURSE_SCOPE_CACHE_TTL', 300))
+
+    # Largest page the question listing API serves
+    QUESTION_LIST_MAX_LIMIT = int(os.getenv('QUESTION_LIST_MAX_LIMIT', 200))
+
+    # Shingle Jaccard similarity from which two questions count as near duplicates
+    SIMILARITY_THRESHOLD = float(os.getenv('SIMILARITY_THRESHOLD', 0.7))
+
+    # Question search: 'auto' uses MySQL FULLTEXT or SQLite FTS5 when
+    # available, else ('memory') process-local per-course indexes
+    QUESTION_SEARCH_BACKEND = os.getenv('QUESTION_SEARCH_BACKEND', 'auto')
+    QUESTION_SEARCH_INDEX_MAX_COURSES = int(os.getenv('QUESTION_SEARCH_INDEX_MAX_COURSES', 64))
+    QUESTION_SEARCH_INDEX_TTL = int(os.getenv('QUESTION_SEARCH_INDEX_TTL', 300))
+
+    # Bulk faculty onboarding (accounts per INSERT, password hashing processes)
+    FACULTY_IMPORT_BATCH_SIZE = int(os.getenv('FACULTY_IMPORT_BATCH_SIZE', 500))
+    FACULTY_IMPORT_WORKERS = int(os.getenv('FACULTY_IMPORT_WORKERS', os.cpu_count() or 1))
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
@@ -1,5 +1,25 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from flask_jwt_extended import JWTManager
+from .utils.cache import LRUCache
+from .utils.course_scope import CourseScopeService
+from .utils.generation_jobs import GenerationJobRunner
+from .utils.pool_index import QuestionPoolIndex
+from .utils.pool_stats import QuestionPoolStats
+from .utils.question_search import QuestionSearch
+from .utils.similarity import SimilarityIndex
+from .utils.tokens import RevocationList
+from .utils.topic_tree import TopicTree
 
 db = SQLAlchemy()
 migrate = Migrate()
+jwt = JWTManager()
+revoked_tokens = RevocationList()
+pool_index = QuestionPoolIndex()
+pool_stats = QuestionPoolStats()
+similarity_index = SimilarityIndex()
+topic_tree = TopicTree()
+question_search = QuestionSearch()
+generation_jobs = GenerationJobRunner()
+paper_view_cache = LRUCache()
+course_scopes = CourseScopeService()
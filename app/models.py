@@ -1,8 +1,14 @@
 from datetime import datetime
+from sqlalchemy.orm import deferred, validates
 from .extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
+def normalize_email(email):
+    """Emails are stored trimmed and lower-cased so lookups can use the unique index."""
+    return (email or '').strip().lower()
+
+
 # =====================================================
 # SUPER ADMINS
 # =====================================================
@@ -14,6 +20,10 @@ class SuperAdmin(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    @validates('email')
+    def _normalize_email(self, key, email):
+        return normalize_email(email)
+
     def set_password(self, raw_password):
         self.password_hash = generate_password_hash(raw_password)
 
@@ -84,6 +94,10 @@ class Faculty(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     active = db.Column(db.Boolean, nullable=False, default=True)
 
+    @validates('email')
+    def _normalize_email(self, key, email):
+        return normalize_email(email)
+
 
 # =====================================================
 # PROGRAMME
@@ -215,6 +229,9 @@ class ProgrammeCourseOffering(db.Model):
     name='chk_semester_range'
 )
 ,
+        # Faculty course scope and semester listings
+        db.Index('ix_offerings_faculty_course', 'faculty_id', 'course_id'),
+        db.Index('ix_offerings_programme_semester', 'programme_id', 'semester_no'),
     )
 
 
@@ -279,7 +296,19 @@ class Topic(db.Model):
         backref='topics',
         foreign_keys=[co_id]
     )
-    
+
+
+class TopicClosure(db.Model):
+    """
+    Every ancestor/descendant pair of the topic tree, self pairs included
+    (depth 0), kept in step by the hooks in utils.topic_tree. Derived from
+    parent_topic_id and rebuilt by `flask questions topic-tree`.
+    """
+    __tablename__ = 'tbl_topic_closure'
+
+    ancestor_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    descendant_id = db.Column(db.Integer, primary_key=True, autoincrement=False, index=True)
+    depth = db.Column(db.Integer, nullable=False)
 
 
 # =====================================================
@@ -304,6 +333,10 @@ class Template(db.Model):
     categories = db.Column(db.JSON, nullable=False)
     bloom_distribution = db.Column(db.JSON, nullable=True)
 
+    __table_args__ = (
+        db.Index('ix_templates_course_active', 'course_id', 'is_active'),
+    )
+
 
 # =====================================================
 # QUESTIONS
@@ -325,7 +358,9 @@ class Question(db.Model):
         nullable=False
     )
 
-    text = db.Column(db.Text, nullable=False)
+    # Question bodies are deferred: ORM loads fetch them only on access
+    # (views that render them select the columns explicitly)
+    text = deferred(db.Column(db.Text, nullable=False), group='body')
 
     question_type = db.Column(
         db.String(32),  # 'mcq' or 'descriptive'
@@ -344,15 +379,23 @@ class Question(db.Model):
         nullable=False
     )
 
-    options = db.Column(
+    options = deferred(db.Column(
         db.JSON,  # Only for MCQ
         nullable=True
-    )
+    ), group='body')
 
     active = db.Column(db.Boolean, default=True)
 
     topic = db.relationship('Topic', backref='questions')
 
+    __table_args__ = (
+        # Pool lookups by course → topic → (type, marks), active only
+        db.Index(
+            'ix_questions_pool',
+            'course_id', 'topic_id', 'question_type', 'mark_value', 'active'
+        ),
+    )
+
 
 
 
@@ -378,7 +421,7 @@ class GeneratedPaper(db.Model):
 
     course = db.relationship('Course', backref='generated_papers')
     template = db.relationship('Template', backref='generated_papers')
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     generated_by = db.Column(
         db.Integer,
@@ -388,6 +431,15 @@ class GeneratedPaper(db.Model):
 
     co_weightages_snapshot = db.Column(db.JSON, nullable=False)
 
+    # Set A / B / C ... when generated as part of a variant batch
+    set_label = db.Column(db.String(8), nullable=True)
+
+    __table_args__ = (
+        # Paper history, newest first (keyset on created_at, id)
+        db.Index('ix_generated_papers_course_created', 'course_id', 'created_at', 'id'),
+        db.Index('ix_generated_papers_generator_created', 'generated_by', 'created_at', 'id'),
+    )
+
     questions = db.relationship(
         'GeneratedPaperQuestion',
         backref='paper',
@@ -417,3 +469,135 @@ class GeneratedPaperQuestion(db.Model):
     mark_value = db.Column(db.Integer, nullable=False)
     section_label = db.Column(db.String(64))
     co_satisfied = db.Column(db.String(32))
+
+    __table_args__ = (
+        db.Index('ix_generated_paper_questions_paper_order', 'paper_id', 'order'),
+    )
+
+
+# =====================================================
+# QUESTION USAGE (exposure tracking)
+# =====================================================
+class QuestionUsage(db.Model):
+    __tablename__ = 'tbl_question_usage'
+
+    question_id = db.Column(
+        db.Integer,
+        db.ForeignKey('tbl_questions.id'),
+        primary_key=True
+    )
+
+    course_id = db.Column(
+        db.Integer,
+        db.ForeignKey('tbl_courses.id'),
+        nullable=False,
+        index=True
+    )
+
+    use_count = db.Column(db.Integer, nullable=False, default=0)
+    last_used_at = db.Column(db.DateTime, nullable=True)
+    last_paper_id = db.Column(db.Integer, nullable=True)
+
+
+# =====================================================
+# QUESTION POOL STATISTICS
+# =====================================================
+class QuestionPoolStat(db.Model):
+    """
+    Question counts per pool cell, kept in step with tbl_questions by the
+    hooks in utils.pool_stats. Derived data: no foreign keys, and
+    `flask questions reconcile-stats` rebuilds it from scratch.
+    """
+    __tablename__ = 'tbl_question_pool_stats'
+
+    course_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    topic_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    question_type = db.Column(db.String(32), primary_key=True)
+    mark_value = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    bloom_level = db.Column(db.String(32), primary_key=True)
+    difficulty = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    active = db.Column(db.Boolean, primary_key=True)
+
+    question_count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# =====================================================
+# NEAR-DUPLICATE INDEX
+# =====================================================
+class QuestionSimilarity(db.Model):
+    """
+    MinHash/LSH band buckets of question texts (see utils.similarity).
+    Derived data, rebuilt by `flask questions similarity-index`.
+    """
+    __tablename__ = 'tbl_question_similarity'
+
+    course_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    band = db.Column(db.SmallInteger, primary_key=True, autoincrement=False)
+    bucket = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    question_id = db.Column(db.Integer, primary_key=True, autoincrement=False, index=True)
+
+
+# =====================================================
+# FULL-TEXT SEARCH
+# =====================================================
+class QuestionSearchDocument(db.Model):
+    """
+    Searchable text (question text + MCQ options) of each question, see
+    utils.question_search. FULLTEXT-indexed on MySQL; on SQLite an FTS5
+    table follows it. Derived data, rebuilt by `flask questions search-index`.
+    """
+    __tablename__ = 'tbl_question_search'
+    __table_args__ = (
+        db.Index('ix_tbl_question_search_body', 'body', mysql_prefix='FULLTEXT').ddl_if(dialect='mysql'),
+    )
+
+    question_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    course_id = db.Column(db.Integer, nullable=False, index=True)
+    body = db.Column(db.Text, nullable=False)
+
+
+# =====================================================
+# BACKGROUND GENERATION JOBS
+# =====================================================
+class GenerationJob(db.Model):
+    __tablename__ = 'tbl_generation_jobs'
+
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+
+    course_id = db.Column(
+        db.Integer,
+        db.ForeignKey('tbl_courses.id'),
+        nullable=False
+    )
+
+    created_by = db.Column(
+        db.Integer,
+        db.ForeignKey('tbl_faculty.id'),
+        nullable=False
+    )
+
+    topic_ids = db.Column(db.JSON, nullable=False)
+    variant_count = db.Column(db.Integer, nullable=False, default=1)
+    max_overlap = db.Column(db.Integer, nullable=True)
+
+    # queued → running → succeeded | failed
+    status = db.Column(db.String(16), nullable=False, default='queued', index=True)
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    shortfalls = db.Column(db.JSON, nullable=True)
+    paper_ids = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        paper_ids = self.paper_ids or []
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': self.progress,
+            'shortfalls': self.shortfalls or [],
+            'paper_id': paper_ids[0] if paper_ids else None,
+            'paper_ids': paper_ids,
+            'error': self.error
+        }
@@ -1,9 +1,11 @@
 # app/routes/api_auth.py
 from flask import Blueprint, request, jsonify, session
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
 from werkzeug.security import check_password_hash, generate_password_hash
-from ..extensions import db
-from ..models import SuperAdmin, Faculty
-from ..utils.auth import initialize_user_session
+from ..extensions import db, revoked_tokens
+from ..models import SuperAdmin, Faculty, normalize_email
+from ..utils.auth import Principal, current_principal, find_identity, initialize_user_session
+from ..utils.tokens import issue_tokens, refresh_access_token
 
 api_auth_bp = Blueprint('api_auth', __name__)
 
@@ -16,9 +18,7 @@ def api_superadmin_login():
     if not email or not password:
         return jsonify({"msg": "Missing email or password"}), 400
 
-    admin = SuperAdmin.query.filter(
-        db.func.lower(db.func.trim(SuperAdmin.email)) == email
-    ).first()
+    admin = SuperAdmin.query.filter_by(email=normalize_email(email)).first()
 
     if not admin or not admin.check_password(password):
         return jsonify({"msg": "Bad credentials"}), 401
@@ -35,6 +35,49 @@ def api_logout():
 
 @api_auth_bp.route('/check', methods=['GET'])
 def api_check_auth():
-    if 'user_id' not in session:
+    principal = current_principal()
+    if not principal.is_authenticated:
         return jsonify({"authenticated": False}), 401
-    return jsonify({"authenticated": True, "role": session.get('role')}), 200
+    return jsonify({"authenticated": True, "role": principal.role}), 200
+
+
+# ========================================
+# BEARER TOKENS (API clients)
+# ========================================
+@api_auth_bp.route('/token', methods=['POST'])
+def api_issue_token():
+    """Exchange credentials for an access + refresh token pair."""
+    data = request.get_json() or {}
+    email = (data.get('email') or "").strip().lower()
+    password = data.get('password') or ""
+
+    if not email or not password:
+        return jsonify({"msg": "Missing email or password"}), 400
+
+    identity = find_identity(email)
+    if not identity or not check_password_hash(identity.password_hash, password):
+        return jsonify({"msg": "Bad credentials"}), 401
+
+    if not identity.active:
+        return jsonify({"msg": "Account is deactivated"}), 403
+
+    return jsonify(issue_tokens(Principal.from_identity(identity))), 200
+
+
+@api_auth_bp.route('/token/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def api_refresh_token():
+    access_token = refresh_access_token(get_jwt_identity(), get_jwt())
+    if access_token is None:
+        return jsonify({"msg": "Account is deactivated or no longer exists"}), 401
+
+    return jsonify({"access_token": access_token}), 200
+
+
+@api_auth_bp.route('/token/revoke', methods=['POST'])
+@jwt_required(verify_type=False)
+def api_revoke_token():
+    """Revoke the presented token (access or refresh) in this process."""
+    claims = get_jwt()
+    revoked_tokens.revoke(claims['jti'], claims['exp'])
+    return jsonify({"msg": "Token revoked"}), 200
@@ -1,41 +1,29 @@
 from flask import Blueprint, request, jsonify, session
 from ..extensions import db
 from ..models import Department, Faculty
+from ..utils.auth import current_principal
 
 api_department_bp = Blueprint('api_department', __name__)
 
 
-def get_current_user():
-    role = session.get('role')
-    user_id = session.get('user_id')
-
-    if role == 'super_admin':
-        return role, None
-
-    if role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-        return role, faculty
-
-    return None, None
-
-
 # ========================================
 # GET DEPARTMENTS
 # ========================================
 @api_department_bp.route('', methods=['GET'])
 def get_departments():
-    role, faculty = get_current_user()
-    is_superadmin = session.get('role') == 'super_admin'
+    principal = current_principal()
 
     # SuperAdmin → all departments
-    if role == 'super_admin':
+    if principal.is_super_admin:
         departments = Department.query.order_by(
             Department.id.desc()
         ).all()
 
     # HOD → only own department
-    elif role == 'faculty' and faculty and faculty.department.hod_id == faculty.id:
-        departments = [faculty.department]
+    elif principal.is_hod:
+        departments = Department.query.filter_by(
+            id=principal.department_id
+        ).all()
 
     else:
         return jsonify({"msg": "Forbidden"}), 403
@@ -54,10 +42,8 @@ def get_departments():
 # ========================================
 @api_department_bp.route('', methods=['POST'])
 def create_department():
-    role = session.get('role')
-
     # Only SuperAdmin can create departments
-    if role != 'super_admin':
+    if not current_principal().is_super_admin:
         return jsonify({"msg": "Forbidden"}), 403
 
     data = request.get_json() or {}
@@ -2,12 +2,13 @@
 from flask import Blueprint, request, jsonify, session
 from werkzeug.security import generate_password_hash
 from ..extensions import db
+from ..utils.auth import current_principal
 from ..models import Faculty, Department
 
 api_faculty_bp = Blueprint('api_faculty', __name__)
 
 def is_super_admin():
-    return session.get('role') == 'super_admin'
+    return current_principal().is_super_admin
 
 @api_faculty_bp.route('', methods=['GET'])
 def get_faculties():
@@ -1,12 +1,13 @@
 # app/routes/api_programmes.py
 from flask import Blueprint, request, jsonify, session
 from ..extensions import db
+from ..utils.auth import current_principal
 from ..models import Programme, Department
 
 api_programme_bp = Blueprint('api_programme', __name__)
 
 def is_super_admin():
-    return session.get('role') == 'super_admin'
+    return current_principal().is_super_admin
 
 @api_programme_bp.route('', methods=['GET'])
 def get_programmes():
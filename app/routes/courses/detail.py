@@ -1,13 +1,13 @@
 from pydoc_data.topics import topics
-from flask import render_template, request, redirect, session, url_for, flash
-from app.extensions import db
+from flask import render_template, request, redirect, url_for, flash
+from app.extensions import db, topic_tree
 from app.models import (
     Course,
     ProgrammeCourseOffering,
     CourseOutcome,
     Topic
 )
-from app.utils.auth import admin_or_hod_required, login_required
+from app.utils.auth import admin_or_hod_required, current_principal, login_required
 from .routes import courses_bp  # reuse existing blueprint
 LEARNING_DOMAINS = {
     "K": "Remember",
@@ -27,7 +27,7 @@ LEARNING_DOMAINS = {
 @login_required
 def course_detail(course_id):
     course = Course.query.get_or_404(course_id)
-    is_superadmin = session.get('role') == 'super_admin'
+    is_superadmin = current_principal().is_super_admin
 
 
     # =========================
@@ -84,6 +84,7 @@ def course_detail(course_id):
             topic_code = request.form.get('topic_code', '').strip()
             topic_title = request.form.get('topic_title', '').strip()
             co_id = request.form.get('co_id', type=int)
+            parent_topic_id = request.form.get('parent_topic_id', type=int)
 
             if not topic_code or not topic_title or not co_id:
                 flash('Topic code, description, and CO are required', 'error')
@@ -109,11 +110,21 @@ def course_detail(course_id):
                 flash('Topic code already exists for this course', 'error')
                 return redirect(request.url)
 
+            # Parent topic must belong to this course
+            if parent_topic_id and not Topic.query.filter_by(
+                id=parent_topic_id,
+                course_id=course.id
+            ).first():
+                flash('Invalid parent topic selected', 'error')
+                return redirect(request.url)
+
+            # Closure table paths are written by the topic_tree flush hook
             topic = Topic(
                 code=topic_code,
                 title=topic_title,
                 course_id=course.id,
-                co_id=co.id
+                co_id=co.id,
+                parent_topic_id=parent_topic_id or None
             )
 
             db.session.add(topic)
@@ -138,13 +149,10 @@ def course_detail(course_id):
         course_id=course.id
     ).all()
 
-    topics = Topic.query.filter_by(
-        course_id=course.id
-    ).all()
-
-    role = session.get('role')
+    # Whole topic tree with subtree question counts, in two queries
+    topics = topic_tree.course_tree(course.id)
 
-    if role == 'super_admin':
+    if is_superadmin:
          layout_template = 'layout_dashboard.html'
     else:
         layout_template = 'layout_faculty.html' 
@@ -216,6 +224,7 @@ def edit_topic(topic_id):
     new_code = request.form.get('topic_code', '').strip()
     new_title = request.form.get('topic_title', '').strip()
     new_co_id = request.form.get('co_id', type=int)
+    new_parent_id = request.form.get('parent_topic_id', type=int) or None
 
     if not new_code or not new_title or not new_co_id:
         flash('All fields are required', 'error')
@@ -242,9 +251,21 @@ def edit_topic(topic_id):
         flash('Another topic with this ID already exists', 'error')
         return redirect(request.referrer)
 
+    # Parent must be in the same course and not the topic or one of its subtopics
+    if new_parent_id:
+        parent = Topic.query.filter_by(
+            id=new_parent_id,
+            course_id=topic.course_id
+        ).first()
+
+        if not parent or topic_tree.contains(topic.id, new_parent_id):
+            flash('Invalid parent topic selected', 'error')
+            return redirect(request.referrer)
+
     topic.code = new_code
     topic.title = new_title
     topic.co_id = new_co_id
+    topic.parent_topic_id = new_parent_id
 
     db.session.commit()
 
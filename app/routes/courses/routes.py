@@ -1,7 +1,7 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash
 from app.models import Course, Department, Programme, Faculty, ProgrammeCourseOffering, CourseOutcome, Topic
 from app.extensions import db
-from app.utils.auth import admin_or_hod_required, verify_csrf_token
+from app.utils.auth import admin_or_hod_required, current_principal, verify_csrf_token
 
 courses_bp = Blueprint(
     'courses',
@@ -13,7 +13,8 @@ courses_bp = Blueprint(
 @courses_bp.route('/', methods=['GET', 'POST'])
 @admin_or_hod_required
 def manage_courses():
-    role = session.get('role')
+    principal = current_principal()
+    role = principal.role
 
     # =========================
     # Determine Scope
@@ -23,8 +24,7 @@ def manage_courses():
         courses_query = Course.query
 
     else:  # HOD
-        faculty = Faculty.query.get(session['user_id'])
-        department = faculty.department
+        department = Department.query.get_or_404(principal.department_id)
 
         departments = [department]  # HOD can only see own dept
         courses_query = Course.query.filter_by(
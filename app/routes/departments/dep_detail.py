@@ -1,7 +1,7 @@
-from flask import render_template, request, redirect, url_for, flash, Blueprint,session
+from flask import render_template, request, redirect, url_for, flash, Blueprint
 from app.extensions import db
 from app.models import Department, Faculty
-from app.utils.auth import admin_or_hod_required
+from app.utils.auth import admin_or_hod_required, current_principal
 
 
 departments_bp = Blueprint(
@@ -15,7 +15,7 @@ departments_bp = Blueprint(
 @admin_or_hod_required
 def department_detail(dept_id):
     department = Department.query.get_or_404(dept_id)
-    is_superadmin = (session.get('role') == 'super_admin')
+    is_superadmin = current_principal().is_super_admin
 
     if request.method == 'POST':
         new_hod_id = request.form.get('hod_id', type=int)
@@ -1,6 +1,8 @@
-from flask import Blueprint, render_template, session, redirect, url_for
-from app.models import Faculty, ProgrammeCourseOffering
+from flask import Blueprint, render_template, redirect, url_for, abort
+from app.extensions import pool_stats
+from app.models import ProgrammeCourseOffering
 from app.routes.main import login_required
+from app.utils.auth import current_principal
 
 fac_dashboard_bp = Blueprint(
     'faculty',
@@ -12,31 +14,41 @@ fac_dashboard_bp = Blueprint(
 @fac_dashboard_bp.route('/dashboard')
 @login_required
 def faculty_dashboard():
-    if session.get('role') != 'faculty':
+    principal = current_principal()
+    if principal.role != 'faculty':
         return redirect(url_for('main.login'))
 
-    faculty = Faculty.query.get_or_404(session['user_id'])
+    faculty = principal.faculty
+    if faculty is None:
+        abort(404)
 
     offerings = ProgrammeCourseOffering.query.filter_by(
         faculty_id=faculty.id
     ).all()
 
+    # Active / inactive question totals per course, from the pool statistics
+    question_totals = pool_stats.course_totals({o.course_id for o in offerings})
+
     return render_template(
         'faculty_dashboard.html',
         faculty=faculty,
-        offerings=offerings
+        offerings=offerings,
+        question_totals=question_totals
     )
 
 
 @fac_dashboard_bp.route('/hod-dashboard')
 @login_required
 def hod_dashboard():
-    if session.get('role') != 'faculty':
+    principal = current_principal()
+    if principal.role != 'faculty':
         return redirect(url_for('main.login'))
 
-    faculty = Faculty.query.get_or_404(session['user_id'])
+    if principal.faculty is None:
+        abort(404)
 
-    if faculty.department.hod_id != faculty.id:
+    faculty = principal.faculty
+    if not principal.is_hod:
         return redirect(url_for('faculty.faculty_dashboard'))
 
     return render_template(
@@ -1,9 +1,10 @@
 # app/routes/main.py
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify, current_app
 from werkzeug.security import generate_password_hash, check_password_hash
 from ..extensions import db
 from app.models import Faculty, SuperAdmin, Department, Programme, ProgrammeCourseOffering, Course
-from ..utils.auth import login_required, admin_or_hod_required, verify_csrf_token, initialize_user_session
+from ..utils.auth import login_required, admin_or_hod_required, verify_csrf_token, initialize_user_session, current_principal, find_identity
+from ..utils.faculty_import import FacultyImportError, import_faculty, read_faculty_rows
 
 main_bp = Blueprint('main', __name__)
 
@@ -18,8 +19,9 @@ main_bp = Blueprint('main', __name__)
 # =====================================================
 @main_bp.route('/', methods=['GET'])
 def index():
-    if 'user_id' in session:
-        if session.get('role') == 'super_admin':
+    principal = current_principal()
+    if principal.is_authenticated:
+        if principal.is_super_admin:
             return redirect(url_for('main.superadmin_dashboard'))
         else:
             return redirect(url_for('faculty.faculty_dashboard'))
@@ -27,18 +29,8 @@ def index():
 
 @main_bp.app_context_processor
 def inject_role_flags():
-
-    from flask import session
-
-    role = session.get('role')
-    is_hod = False
-
-    if role == 'faculty':
-        faculty = Faculty.query.get(session.get('user_id'))
-        if faculty and faculty.department.hod_id == faculty.id:
-            is_hod = True
-
-    return dict(is_hod=is_hod)
+    principal = current_principal()
+    return dict(is_hod=principal.is_hod, principal=principal)
 
 @main_bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -50,31 +42,19 @@ def login():
             flash('Email and password required', 'error')
             return redirect(url_for('main.login'))
 
-        # Try SuperAdmin
-        admin = SuperAdmin.query.filter(
-            db.func.lower(SuperAdmin.email) == email
-        ).first()
+        # SuperAdmin or Faculty, resolved in one query
+        identity = find_identity(email)
 
-        if admin and admin.check_password(password):
-            # Initialize fresh session for this user
-            initialize_user_session(admin.id, 'super_admin')
-            return redirect(url_for('main.superadmin_dashboard'))
-
-        # Try Faculty
-        faculty = Faculty.query.filter(
-            db.func.lower(Faculty.email) == email
-        ).first()
-
-        if faculty and check_password_hash(faculty.password_hash, password):
-            if not faculty.active:
+        if identity and check_password_hash(identity.password_hash, password):
+            if not identity.active:
                 flash('Your account is deactivated. Please contact the administrator.', 'error')
                 return redirect(url_for('main.login'))
 
             # Initialize fresh session for this user
-            initialize_user_session(faculty.id, 'faculty')
+            initialize_user_session(identity.id, identity.role)
 
-            # HOD detection
-            if faculty.department.hod_id == faculty.id:
+            # Super admins and HODs land on the admin dashboard
+            if identity.role == 'super_admin' or identity.is_hod:
                 return redirect(url_for('main.superadmin_dashboard'))
 
             return redirect(url_for('faculty.faculty_dashboard'))
@@ -97,8 +77,9 @@ def logout():
 @admin_or_hod_required
 def superadmin_dashboard():
 
-    role = session.get('role')
-    is_superadmin = session.get('role') == 'super_admin'
+    principal = current_principal()
+    role = principal.role
+    is_superadmin = principal.is_super_admin
 
     if role == 'super_admin':
         departments = Department.query.order_by(
@@ -112,13 +93,11 @@ def superadmin_dashboard():
         )
 
     elif role == 'faculty':
-        faculty = Faculty.query.get(session['user_id'])
-
         # HOD goes directly to their department
         return redirect(
             url_for(
                 'departments.department_detail',
-                dept_id=faculty.department.id,
+                dept_id=principal.department_id,
                 is_superadmin=is_superadmin
             )
         )
@@ -130,13 +109,14 @@ def superadmin_dashboard():
 @main_bp.route('/superadmin/faculties', methods=['GET', 'POST'])
 @admin_or_hod_required
 def faculty_management():
-    role = session.get('role')
-    user_id = session.get('user_id')
-    
+    # Role and department come from the principal, so bearer-token
+    # requests are scoped like session ones
+    principal = current_principal()
+    role = principal.role
+
     hod_dept_id = None
     if role == 'faculty':
-        current_faculty = Faculty.query.get(user_id)
-        hod_dept_id = current_faculty.department_id
+        hod_dept_id = principal.department_id
 
     if request.method == 'POST':
         if not verify_csrf_token():
@@ -182,6 +162,36 @@ def faculty_management():
                          faculties=faculties, 
                          departments=departments)
 
+
+@main_bp.route('/superadmin/faculties/import', methods=['POST'])
+@admin_or_hod_required
+def import_faculties():
+    """
+    Bulk onboarding from an uploaded CSV of name, email, department and
+    optional password. HODs may only onboard into their own department.
+    """
+    if not verify_csrf_token():
+        return jsonify({"msg": "Invalid CSRF token"}), 400
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({"msg": "CSV file is required"}), 400
+
+    principal = current_principal()
+    department_ids = None if principal.is_super_admin else [principal.department_id]
+
+    try:
+        report = import_faculty(
+            read_faculty_rows(upload.stream),
+            department_ids=department_ids,
+            batch_size=current_app.config['FACULTY_IMPORT_BATCH_SIZE'],
+            workers=current_app.config['FACULTY_IMPORT_WORKERS']
+        )
+    except FacultyImportError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    return jsonify(report)
+
 # =====================================================
 # PROGRAMME MANAGEMENT
 # =====================================================
@@ -189,7 +199,8 @@ def faculty_management():
 @admin_or_hod_required
 def programme_management():
 
-    role = session.get('role')
+    principal = current_principal()
+    role = principal.role
 
     # =========================
     # Determine Scope
@@ -199,8 +210,7 @@ def programme_management():
         programmes_query = Programme.query
 
     else:  # HOD
-        faculty = Faculty.query.get(session['user_id'])
-        department = faculty.department
+        department = Department.query.get_or_404(principal.department_id)
 
         departments = [department]  # HOD can only see own dept
         programmes_query = Programme.query.filter_by(
@@ -360,15 +370,13 @@ def programme_detail(programme_id):
 @main_bp.route('/superadmin/programmes/<int:programme_id>/toggle_status', methods=['POST'])
 @admin_or_hod_required
 def toggle_programme_status(programme_id):
-    role = session.get('role')
-    user_id = session.get('user_id')
+    principal = current_principal()
 
     programme = Programme.query.get_or_404(programme_id)
 
     # For HOD, verify department ownership
-    if role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-        if programme.department_id != faculty.department_id:
+    if not principal.is_super_admin:
+        if programme.department_id != principal.department_id:
             flash('Not authorized to access programmes in other departments', 'error')
             return redirect(url_for('main.programme_management'))
 
@@ -424,10 +432,9 @@ def delete_faculty(faculty_id):
     faculty = Faculty.query.get_or_404(faculty_id)
     
     # HOD Authorization Check
-    role = session.get('role')
-    if role == 'faculty':
-        current_faculty = Faculty.query.get(session.get('user_id'))
-        if faculty.department_id != current_faculty.department_id:
+    principal = current_principal()
+    if not principal.is_super_admin:
+        if faculty.department_id != principal.department_id:
             flash('Unauthorized to delete faculty from another department', 'error')
             return redirect(url_for('main.faculty_management'))
 
@@ -442,10 +449,9 @@ def toggle_faculty_status(faculty_id):
     faculty = Faculty.query.get_or_404(faculty_id)
     
     # HOD Authorization Check
-    role = session.get('role')
-    if role == 'faculty':
-        current_faculty = Faculty.query.get(session.get('user_id'))
-        if faculty.department_id != current_faculty.department_id:
+    principal = current_principal()
+    if not principal.is_super_admin:
+        if faculty.department_id != principal.department_id:
             flash('Unauthorized to manage faculty from another department', 'error')
             return redirect(url_for('main.faculty_management'))
 
@@ -1,7 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, flash, session, url_for
+from flask import Blueprint, render_template, request, redirect, flash, url_for
 from app.extensions import db
 from app.models import Template, Course, Faculty, ProgrammeCourseOffering
-from app.utils.auth import admin_or_hod_required,login_required
+from app.utils.auth import admin_or_hod_required, current_principal, login_required
+from app.utils.course_scope import current_scope
+
+BLOOM_LEVELS = ['Remember', 'Understand', 'Apply', 'Analyse', 'Evaluate', 'Create']
 
 templates_bp = Blueprint(
     'templates',
@@ -13,41 +16,26 @@ templates_bp = Blueprint(
 @login_required
 def manage_template():
 
-    role = session.get('role')
-    user_id = session.get('user_id')
-
     # =========================================
     # Determine Course Scope
     # =========================================
-    if role == 'super_admin':
-        courses = Course.query.order_by(Course.code).all()
-
-    elif role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-
-        if faculty.department.hod_id == faculty.id:
-            courses = Course.query.filter_by(
-                home_department_id=faculty.department.id
-            ).all()
-        else:
-            offerings = ProgrammeCourseOffering.query.filter_by(
-                faculty_id=faculty.id
-            ).all()
-
-            course_ids = {o.course_id for o in offerings}
-            courses = Course.query.filter(
-                Course.id.in_(course_ids)
-            ).all()
-    else:
+    if current_principal().role not in ('super_admin', 'faculty'):
         flash("Unauthorized", "error")
         return redirect(url_for('main.login'))
 
+    scope = current_scope()
+    courses = scope.courses
+
     selected_course_id = request.args.get('course_id', type=int)
     archived_id = request.args.get('archived_id', type=int)
     template = None
     edit_mode = False
     viewing_archived = False
 
+    if selected_course_id and selected_course_id not in scope:
+        flash("Unauthorized", "error")
+        return redirect(url_for('templates.manage_template'))
+
     if selected_course_id:
         if archived_id:
             template = Template.query.filter_by(
@@ -122,12 +110,24 @@ def manage_template():
             flash("Section marks do not match total marks", "error")
             return redirect(request.url)
 
+        # Optional Bloom-level targets (% of marks) for constrained generation
+        bloom_distribution = {
+            level: request.form.get(f'bloom_{level}', type=int)
+            for level in BLOOM_LEVELS
+            if request.form.get(f'bloom_{level}', type=int)
+        }
+
+        if bloom_distribution and sum(bloom_distribution.values()) != 100:
+            flash("Bloom level distribution must add up to 100%", "error")
+            return redirect(request.url)
+
         # Always create a new template instance
         new_template = Template(
             course_id=course_id,
             duration_minutes=duration,
             total_marks=total_marks,
             categories=sections,
+            bloom_distribution=bloom_distribution or None,
             is_active=True
         )
 
@@ -158,6 +158,7 @@ def manage_template():
         template=template,
         edit_mode=edit_mode,
         viewing_archived=viewing_archived,
-        archived_templates=archived_templates
+        archived_templates=archived_templates,
+        bloom_levels=BLOOM_LEVELS
     )
 
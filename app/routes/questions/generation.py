@@ -1,8 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, flash, session, url_for, jsonify
-from app.extensions import db
-from app.models import Course, Template, Topic, Question, GeneratedPaper, GeneratedPaperQuestion, Faculty, ProgrammeCourseOffering
-from app.utils.auth import login_required
-import random
+from flask import Blueprint, render_template, request, redirect, flash, url_for, jsonify, current_app, abort
+from app.extensions import db, generation_jobs, paper_view_cache, pool_stats, topic_tree
+from app.models import Course, Department, Template, Topic, Question, GeneratedPaper, GeneratedPaperQuestion, GenerationJob, Faculty, ProgrammeCourseOffering
+from app.utils.auth import current_principal, login_required
+from app.utils.course_scope import current_scope
+from app.utils.paper_generator import GenerationError, generate_papers, section_availability
+from sqlalchemy import and_, func, or_, select
+from datetime import datetime
 
 generation_bp = Blueprint(
     'generation',
@@ -13,28 +16,18 @@ generation_bp = Blueprint(
 @generation_bp.route('', methods=['GET'])
 @login_required
 def generation_index():
-    role = session.get('role')
-    user_id = session.get('user_id')
-
-    if role == 'super_admin':
-        courses = Course.query.all()
-    elif role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-        if faculty.department.hod_id == faculty.id:
-            courses = Course.query.filter_by(home_department_id=faculty.department.id).all()
-        else:
-            offerings = ProgrammeCourseOffering.query.filter_by(faculty_id=faculty.id).all()
-            course_ids = {o.course_id for o in offerings}
-            courses = Course.query.filter(Course.id.in_(course_ids)).all()
-    else:
+    if current_principal().role not in ('super_admin', 'faculty'):
         return redirect(url_for('main.login'))
 
+    courses = current_scope().courses
+
     selected_course_id = request.args.get('course_id', type=int)
     topics = []
     template_exists = False
     
     if selected_course_id:
-        topics = Topic.query.filter_by(course_id=selected_course_id).all()
+        # Whole topic tree with active question counts, in two queries
+        topics = topic_tree.course_tree(selected_course_id)
         template = Template.query.filter_by(course_id=selected_course_id).first()
         template_exists = template is not None
 
@@ -42,11 +35,14 @@ def generation_index():
     topics_data = []
     for t in topics:
         topics_data.append({
-            'id': t.id,
-            'code': t.code,
-            'title': t.title,
-            'co_code': t.co.code if t.co else "N/A",
-            'co_description': t.co.description if t.co else "No CO description"
+            'id': t['id'],
+            'code': t['code'],
+            'title': t['title'],
+            'parent_topic_id': t['parent_topic_id'],
+            'depth': t['depth'],
+            'question_count': t['subtree_question_count'],
+            'co_code': t['co_code'] or "N/A",
+            'co_description': t['co_description'] or "No CO description"
         })
 
     return render_template(
@@ -57,6 +53,34 @@ def generation_index():
         template_exists=template_exists
     )
 
+@generation_bp.route('/feasibility', methods=['GET'])
+@login_required
+def generation_feasibility():
+    course_id = request.args.get('course_id', type=int)
+    topic_ids = request.args.getlist('topic_ids', type=int)
+
+    if not course_id:
+        return jsonify({"msg": "Course is required"}), 400
+
+    template = Template.query.filter_by(
+        course_id=course_id,
+        is_active=True
+    ).first()
+
+    if not template:
+        return jsonify({"msg": "No active template found for this course"}), 404
+
+    # Counts come from the pool statistics, not from tbl_questions;
+    # selected topics include their subtopics
+    available = pool_stats.counts(course_id, topic_tree.subtree_ids(topic_ids)) if topic_ids else {}
+
+    sections = section_availability(template.categories, available)
+
+    return jsonify({
+        "feasible": all(s['available'] >= s['required'] for s in sections),
+        "sections": sections
+    }), 200
+
 @generation_bp.route('/generate', methods=['POST'])
 @login_required
 def generate_paper():
@@ -67,149 +91,356 @@ def generate_paper():
         flash("Course and at least one Topic are required", "error")
         return redirect(url_for('generation.generation_index', course_id=course_id))
 
-    template = Template.query.filter_by(
-        course_id=course_id,
-        is_active=True
-    ).first()
+    try:
+        (paper_id,), _ = generate_papers(course_id, topic_ids, current_principal().id)
+    except GenerationError as e:
+        flash(str(e), "error")
+        return redirect(url_for('generation.generation_index', course_id=course_id))
 
-    if not template:
-        flash("No active template found for this course", "error")
-        return redirect(url_for('generation.generate_paper_form'))
+    db.session.commit()
 
-    # Start generation logic
-    sections_questions = {}
-    total_found_questions = 0
-    
-    for section in template.categories:
-        # Filter questions matching criteria (multiple topics allowed)
-        matching_questions = Question.query.filter(
-            Question.course_id == course_id,
-            Question.topic_id.in_(topic_ids),
-            Question.question_type == section['question_type'],
-            Question.mark_value == section['mark_per_question'],
-            Question.active == True
-        ).all()
-
-        if len(matching_questions) < section['number_of_questions']:
-            criteria = (
-                f"Section: {section['section']}, "
-                f"Type: {section['question_type']}, "
-                f"Marks: {section['mark_per_question']}"
-            )
-            flash(
-                f"Insufficient questions. Required: {section['number_of_questions']}, "
-                f"Available: {len(matching_questions)} for criteria [{criteria}]", 
-                "error"
-            )
-            return redirect(url_for('generation.generation_index', course_id=course_id))
+    flash("Question paper generated successfully", "success")
+    return redirect(url_for('generation.view_paper', paper_id=paper_id))
 
-        # Randomly select questions
-        selected_questions = random.sample(matching_questions, section['number_of_questions'])
-        sections_questions[section['section']] = selected_questions
-        total_found_questions += len(selected_questions)
+@generation_bp.route('/generate-batch', methods=['POST'])
+@login_required
+def generate_paper_batch():
+    course_id = request.form.get('course_id', type=int)
+    topic_ids = request.form.getlist('topic_ids', type=int)
+    variant_count = request.form.get('variant_count', type=int)
+    max_overlap = request.form.get('max_overlap', type=int)
+    max_variants = current_app.config['PAPER_VARIANT_MAX_COUNT']
 
-    # Save GeneratedPaper
-    paper = GeneratedPaper(
-        course_id=course_id,
-        template_id=template.id,
-        total_marks=template.total_marks,
-        duration_minutes=template.duration_minutes,
-        generated_by=session['user_id'],
-        co_weightages_snapshot={} # Placeholder for now as requested simple generation
-    )
-    db.session.add(paper)
-    db.session.flush() # Get paper.id
-
-    order = 1
-    for section_label, questions in sections_questions.items():
-        for q in questions:
-            gp_question = GeneratedPaperQuestion(
-                paper_id=paper.id,
-                question_id=q.id,
-                order=order,
-                mark_value=q.mark_value,
-                section_label=section_label,
-                co_satisfied=q.topic.co.code if q.topic and q.topic.co else "N/A"
-            )
-            db.session.add(gp_question)
-            order += 1
+    if not all([course_id, topic_ids]):
+        flash("Course and at least one Topic are required", "error")
+        return redirect(url_for('generation.generation_index', course_id=course_id))
+
+    if not variant_count or not 1 <= variant_count <= max_variants:
+        flash(f"Number of sets must be between 1 and {max_variants}", "error")
+        return redirect(url_for('generation.generation_index', course_id=course_id))
+
+    try:
+        # Template and pool are loaded once for the whole batch
+        _, overlap = generate_papers(
+            course_id,
+            topic_ids,
+            current_principal().id,
+            variant_count=variant_count,
+            max_overlap=max_overlap
+        )
+    except GenerationError as e:
+        flash(str(e), "error")
+        return redirect(url_for('generation.generation_index', course_id=course_id))
 
     db.session.commit()
 
-    flash("Question paper generated successfully", "success")
-    return redirect(url_for('generation.view_paper', paper_id=paper.id))
+    flash(
+        f"{variant_count} question paper sets generated successfully "
+        f"(max shared questions between two sets: {overlap})",
+        "success"
+    )
+    return redirect(url_for('generation.paper_history'))
 
-@generation_bp.route('/history')
+@generation_bp.route('/jobs', methods=['POST'])
 @login_required
-def paper_history():
-    role = session.get('role')
-    user_id = session.get('user_id')
-
-    if role == 'super_admin':
-        papers = GeneratedPaper.query.order_by(GeneratedPaper.created_at.desc()).all()
-    elif role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-        if faculty.department.hod_id == faculty.id:
+def submit_generation_job():
+    course_id = request.form.get('course_id', type=int)
+    topic_ids = request.form.getlist('topic_ids', type=int)
+    variant_count = request.form.get('variant_count', 1, type=int)
+    max_overlap = request.form.get('max_overlap', type=int)
+    max_variants = current_app.config['PAPER_VARIANT_MAX_COUNT']
+
+    if not all([course_id, topic_ids]):
+        return jsonify({"msg": "Course and at least one Topic are required"}), 400
+
+    if not 1 <= variant_count <= max_variants:
+        return jsonify({"msg": f"Number of sets must be between 1 and {max_variants}"}), 400
+
+    job_id = generation_jobs.submit(
+        course_id,
+        topic_ids,
+        current_principal().id,
+        variant_count=variant_count,
+        max_overlap=max_overlap
+    )
+
+    return jsonify({
+        "job_id": job_id,
+        "status_url": url_for('generation.generation_job_status', job_id=job_id)
+    }), 202
+
+@generation_bp.route('/jobs/<job_id>', methods=['GET'])
+@login_required
+def generation_job_status(job_id):
+    generation_jobs.recover()
+
+    job = GenerationJob.query.get_or_404(job_id)
+
+    principal = current_principal()
+    if not principal.is_super_admin and job.created_by != principal.id:
+        return jsonify({"msg": "Forbidden"}), 403
+
+    data = job.to_dict()
+    if data['paper_id']:
+        data['paper_url'] = url_for('generation.view_paper', paper_id=data['paper_id'])
+    return jsonify(data), 200
+
+def _history_filters(with_course=True):
+    """
+    WHERE clauses for the papers the current user may see, narrowed by the
+    course / department / generator request filters (the course filter
+    only `with_course`). None = not allowed.
+    """
+    principal = current_principal()
+    user_id = principal.id
+    filters = []
+
+    if principal.role == 'super_admin':
+        pass
+    elif principal.role == 'faculty':
+        if principal.is_hod:
             # HOD can see papers for their department's courses
-            courses = Course.query.filter_by(home_department_id=faculty.department.id).all()
-            course_ids = [c.id for c in courses]
-            papers = GeneratedPaper.query.filter(GeneratedPaper.course_id.in_(course_ids)).order_by(GeneratedPaper.created_at.desc()).all()
+            filters.append(Course.home_department_id == principal.department_id)
         else:
             # Faculty can see papers they generated
-            papers = GeneratedPaper.query.filter_by(generated_by=user_id).order_by(GeneratedPaper.created_at.desc()).all()
+            filters.append(GeneratedPaper.generated_by == user_id)
     else:
+        return None
+
+    course_id = request.args.get('course_id', type=int)
+    department_id = request.args.get('department_id', type=int)
+    generated_by = request.args.get('generated_by', type=int)
+
+    if course_id and with_course:
+        filters.append(GeneratedPaper.course_id == course_id)
+    if department_id:
+        filters.append(Course.home_department_id == department_id)
+    if generated_by:
+        filters.append(GeneratedPaper.generated_by == generated_by)
+
+    return filters
+
+def _history_page(filters):
+    """
+    One page of papers (newest first) using keyset pagination on
+    (created_at, id), plus per-course totals from one aggregate query.
+    The totals ignore the course filter, so the course dropdown keeps
+    listing every course once one is selected.
+    """
+    page_size = min(request.args.get('limit', 25, type=int), 100)
+    cursor = request.args.get('cursor', '')
+
+    query = (
+        select(
+            GeneratedPaper.id,
+            GeneratedPaper.created_at,
+            GeneratedPaper.total_marks,
+            GeneratedPaper.duration_minutes,
+            GeneratedPaper.set_label,
+            GeneratedPaper.course_id,
+            Course.code.label('course_code'),
+            Course.title.label('course_title')
+        )
+        .join(Course, Course.id == GeneratedPaper.course_id)
+        .where(*filters)
+        .order_by(GeneratedPaper.created_at.desc(), GeneratedPaper.id.desc())
+        .limit(page_size + 1)
+    )
+
+    if cursor:
+        created_at, _, last_id = cursor.rpartition('_')
+        created_at = datetime.fromisoformat(created_at)
+        query = query.where(or_(
+            GeneratedPaper.created_at < created_at,
+            and_(
+                GeneratedPaper.created_at == created_at,
+                GeneratedPaper.id < int(last_id)
+            )
+        ))
+
+    papers = db.session.execute(query).all()
+
+    next_cursor = None
+    if len(papers) > page_size:
+        papers = papers[:page_size]
+        last = papers[-1]
+        next_cursor = f"{last.created_at.isoformat()}_{last.id}"
+
+    course_counts = db.session.execute(
+        select(
+            Course.id,
+            Course.code,
+            Course.title,
+            func.count(GeneratedPaper.id)
+        )
+        .join(Course, Course.id == GeneratedPaper.course_id)
+        .where(*_history_filters(with_course=False))
+        .group_by(Course.id, Course.code, Course.title)
+        .order_by(Course.code)
+    ).all()
+
+    return papers, next_cursor, course_counts
+
+@generation_bp.route('/history')
+@login_required
+def paper_history():
+    filters = _history_filters()
+    if filters is None:
         return redirect(url_for('main.login'))
 
-    # Group papers by course
+    try:
+        papers, next_cursor, course_counts = _history_page(filters)
+    except ValueError:
+        abort(400)
+
+    totals = {course_id: n for course_id, _, _, n in course_counts}
+
+    # Group this page's papers by course
     grouped_papers = {}
     for p in papers:
-        c_name = f"[{p.course.code}] {p.course.title}" if p.course else "Unknown Course"
+        c_name = f"[{p.course_code}] {p.course_title}"
         if c_name not in grouped_papers:
-            grouped_papers[c_name] = []
-        grouped_papers[c_name].append(p)
+            grouped_papers[c_name] = {'total': totals.get(p.course_id, 0), 'papers': []}
+        grouped_papers[c_name]['papers'].append(p)
+
+    next_url = None
+    if next_cursor:
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        next_url = url_for('generation.paper_history', **args)
+
+    departments = []
+    if current_principal().is_super_admin:
+        departments = Department.query.order_by(Department.name).all()
 
     return render_template(
         'generated_papers_list.html',
-        grouped_papers=grouped_papers
+        grouped_papers=grouped_papers,
+        course_counts=course_counts,
+        departments=departments,
+        next_url=next_url,
+        filters=request.args
     )
 
+@generation_bp.route('/history/api')
+@login_required
+def paper_history_api():
+    filters = _history_filters()
+    if filters is None:
+        return jsonify({"msg": "Forbidden"}), 403
+
+    try:
+        papers, next_cursor, course_counts = _history_page(filters)
+    except ValueError:
+        return jsonify({"msg": "Invalid cursor"}), 400
+
+    return jsonify({
+        "papers": [
+            {
+                "id": p.id,
+                "created_at": p.created_at.isoformat(),
+                "total_marks": p.total_marks,
+                "duration_minutes": p.duration_minutes,
+                "set_label": p.set_label,
+                "course_id": p.course_id,
+                "course_code": p.course_code,
+                "course_title": p.course_title,
+                "url": url_for('generation.view_paper', paper_id=p.id)
+            }
+            for p in papers
+        ],
+        "next_cursor": next_cursor,
+        "course_counts": [
+            {"course_id": cid, "code": code, "title": title, "count": n}
+            for cid, code, title, n in course_counts
+        ]
+    }), 200
+
 @generation_bp.route('/paper/<int:paper_id>')
 @login_required
 def view_paper(paper_id):
-    paper = GeneratedPaper.query.get_or_404(paper_id)
-    course = Course.query.get(paper.course_id)
-    
+    # Generated papers are immutable, so the section data is cached by id
+    view = paper_view_cache.get(paper_id)
+    if view is None:
+        view = _load_paper_view(paper_id)
+        if view is None:
+            abort(404)
+        paper_view_cache.set(paper_id, view)
+
+    return render_template(
+        'view_generated_paper.html',
+        hide_sidebar=True,
+        **view
+    )
+
+def _load_paper_view(paper_id):
+    """Paper, course, template and every question in one joined query."""
+    rows = db.session.execute(
+        select(
+            GeneratedPaper.total_marks,
+            GeneratedPaper.duration_minutes,
+            GeneratedPaper.created_at,
+            GeneratedPaper.set_label,
+            Course.code,
+            Course.title,
+            Template.categories,
+            GeneratedPaperQuestion.section_label,
+            GeneratedPaperQuestion.mark_value,
+            GeneratedPaperQuestion.co_satisfied,
+            Question.text,
+            Question.question_type,
+            Question.options,
+            Question.bloom_level
+        )
+        .select_from(GeneratedPaper)
+        .join(Course, Course.id == GeneratedPaper.course_id)
+        .outerjoin(Template, Template.id == GeneratedPaper.template_id)
+        .outerjoin(GeneratedPaperQuestion, GeneratedPaperQuestion.paper_id == GeneratedPaper.id)
+        .outerjoin(Question, Question.id == GeneratedPaperQuestion.question_id)
+        .where(GeneratedPaper.id == paper_id)
+        .order_by(GeneratedPaperQuestion.order)
+    ).all()
+
+    if not rows:
+        return None
+
+    first = rows[0]
+
     # Group questions by section label
     sections = {}
-    for gp_q in paper.questions:
-        label = gp_q.section_label
-        if label not in sections:
-            sections[label] = []
-        
-        # Load the actual question text and options
-        actual_q = Question.query.get(gp_q.question_id)
-        sections[label].append({
-            'text': actual_q.text,
-            'mark_value': gp_q.mark_value,
-            'question_type': actual_q.question_type,
-            'options': actual_q.options,
-            'co_satisfied': gp_q.co_satisfied
+    for row in rows:
+        if row.section_label is None and row.text is None:
+            continue
+        sections.setdefault(row.section_label, []).append({
+            'text': row.text,
+            'mark_value': row.mark_value,
+            'question_type': row.question_type,
+            'options': row.options,
+            'bloom_level': row.bloom_level,
+            'co_satisfied': row.co_satisfied
         })
 
     # Prepare section metadata (required vs total)
     section_meta = {}
-    if paper.template:
-        for cat in paper.template.categories:
-            section_meta[cat['section']] = {
-                'required': cat.get('required_questions', cat['number_of_questions']),
-                'total': cat['number_of_questions']
-            }
+    for cat in first.categories or []:
+        section_meta[cat['section']] = {
+            'required': cat.get('required_questions') or cat['number_of_questions'],
+            'total': cat['number_of_questions'],
+            'mark_per_question': cat['mark_per_question']
+        }
 
-    return render_template(
-        'view_generated_paper.html',
-        paper=paper,
-        course=course,
-        sections=sections,
-        section_meta=section_meta,
-        hide_sidebar=True
-    )
+    return {
+        'paper': {
+            'id': paper_id,
+            'total_marks': first.total_marks,
+            'duration_minutes': first.duration_minutes,
+            'created_at': first.created_at,
+            'set_label': first.set_label
+        },
+        'course': {
+            'code': first.code,
+            'title': first.title
+        },
+        'sections': sections,
+        'section_meta': section_meta
+    }
@@ -1,7 +1,12 @@
-from flask import Blueprint, render_template, request, redirect, flash, session, url_for
-from app.extensions import db
+from flask import Blueprint, render_template, request, redirect, flash, url_for, jsonify, current_app, Response, stream_with_context
+from app.extensions import db, pool_index, pool_stats, question_search, similarity_index, topic_tree
 from app.models import Course, Template, Topic, Question, ProgrammeCourseOffering, Faculty
-from app.utils.auth import admin_or_hod_required, login_required
+from sqlalchemy import func, or_, select, update
+from app.utils.auth import admin_or_hod_required, current_principal, login_required, verify_csrf_token
+from app.utils.course_scope import current_scope
+from app.utils.pool_stats import record_status_change
+from app.utils.question_export import MIMETYPES, iter_export, question_filters
+from app.utils.question_import import QuestionImportError, detect_format, import_questions, read_rows
 
 
 questions_bp = Blueprint(
@@ -15,54 +20,33 @@ questions_bp = Blueprint(
 @login_required
 def manage_questions():
 
-    role = session.get('role')
-    user_id = session.get('user_id')
-
     # ========================================
     # Determine Course Scope
     # ========================================
-    if role == 'super_admin':
-        courses = Course.query.all()
-
-    elif role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-
-        if faculty.department.hod_id == faculty.id:
-            courses = Course.query.filter_by(
-                home_department_id=faculty.department.id
-            ).all()
-        else:
-            offerings = ProgrammeCourseOffering.query.filter_by(
-                faculty_id=faculty.id
-            ).all()
-
-            course_ids = {o.course_id for o in offerings}
-            courses = Course.query.filter(
-                Course.id.in_(course_ids)
-            ).all()
-    else:
+    if current_principal().role not in ('super_admin', 'faculty'):
         return redirect(url_for('main.login'))
 
+    scope = current_scope()
+    courses = scope.courses
+
     selected_course_id = request.args.get('course_id', type=int)
     selected_topic_id = request.args.get('topic_id', type=int)
 
+    if selected_course_id and selected_course_id not in scope:
+        flash("Not authorized", "error")
+        return redirect(url_for('questions.manage_questions'))
+
     template = None
     topics = []
-    existing_questions = []
 
     if selected_course_id:
         template = Template.query.filter_by(
             course_id=selected_course_id
         ).first()
 
-        topics = Topic.query.filter_by(
-            course_id=selected_course_id
-        ).all()
+        # Topic tree in depth-first order, with question counts
+        topics = topic_tree.course_tree(selected_course_id)
 
-        if selected_topic_id:
-            existing_questions = Question.query.filter_by(
-                topic_id=selected_topic_id
-            ).all()
 
     # ========================================
     # Handle Question Creation
@@ -135,14 +119,20 @@ def manage_questions():
         flash("Question added successfully", "success")
         return redirect(request.url)
 
+    health = None
+    if selected_course_id and template:
+        health = pool_stats.health(selected_course_id, template.categories)
+
     # Pass topics with their CO bloom level for the frontend JS
     topics_with_bloom = []
     for t in topics:
         topics_with_bloom.append({
-            'id': t.id,
-            'code': t.code,
-            'title': t.title,
-            'bloom_level': t.co.bloom_level if t.co else 'N/A'
+            'id': t['id'],
+            'code': t['code'],
+            'title': t['title'],
+            'depth': t['depth'],
+            'question_count': t['subtree_question_count'],
+            'bloom_level': t['bloom_level'] or 'N/A'
         })
 
     return render_template(
@@ -150,9 +140,9 @@ def manage_questions():
         courses=courses,
         topics=topics_with_bloom,
         template=template,
-        existing_questions=existing_questions,
         selected_course_id=selected_course_id,
-        selected_topic_id=selected_topic_id
+        selected_topic_id=selected_topic_id,
+        health=health
     )
 
 
@@ -162,33 +152,349 @@ def toggle_question(question_id):
 
     question = Question.query.get_or_404(question_id)
 
-    role = session.get('role')
-    user_id = session.get('user_id')
-
     # Scope enforcement
-    if role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-
-        # Normal faculty → only assigned courses
-        if faculty.department.hod_id != faculty.id:
-            assigned_ids = {
-                o.course_id
-                for o in ProgrammeCourseOffering.query.filter_by(
-                    faculty_id=faculty.id
-                )
-            }
-            if question.course_id not in assigned_ids:
-                flash("Not authorized", "error")
-                return redirect(request.referrer)
-
-        # HOD → only department owned courses
-        else:
-            if question.course.home_department_id != faculty.department.id:
-                flash("Not authorized", "error")
-                return redirect(request.referrer)
+    if not _course_in_scope(question.course_id):
+        flash("Not authorized", "error")
+        return redirect(request.referrer)
 
     question.active = not question.active
     db.session.commit()
 
     flash("Question status updated", "success")
     return redirect(request.referrer)
+
+
+@questions_bp.route('/pool-health', methods=['GET'])
+@login_required
+def pool_health():
+    """
+    Question counts of a course by topic, (type, mark), Bloom level and
+    difficulty, plus template coverage, read from the pool statistics.
+    """
+    course_id = request.args.get('course_id', type=int)
+
+    if not course_id:
+        return jsonify({"msg": "Course is required"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    template = Template.query.filter_by(course_id=course_id, is_active=True).first()
+    health = pool_stats.health(course_id, template.categories if template else None)
+
+    def kinds(counter):
+        return [
+            {"question_type": t, "mark_value": m, "count": n}
+            for (t, m), n in sorted(counter.items())
+        ]
+
+    return jsonify({
+        "totals": health['totals'],
+        "kinds": kinds(health['kinds']),
+        "topics": [
+            {"topic_id": topic_id, "count": sum(counter.values()), "kinds": kinds(counter)}
+            for topic_id, counter in sorted(health['topics'].items())
+        ],
+        "bloom_levels": dict(health['bloom_levels']),
+        "difficulty": {str(d): n for d, n in sorted(health['difficulty'].items())},
+        "sections": health['sections'],
+    })
+
+
+@questions_bp.route('/similar', methods=['GET'])
+@login_required
+def similar_questions():
+    """
+    Likely duplicates of `text` among the course's questions, from the
+    near-duplicate index. Used live by the add-question form.
+    """
+    course_id = request.args.get('course_id', type=int)
+    text = (request.args.get('text') or '').strip()
+
+    if not course_id:
+        return jsonify({"msg": "Course is required"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    matches = similarity_index.similar(
+        course_id, text,
+        threshold=request.args.get('threshold', type=float),
+        limit=min(request.args.get('limit', 5, type=int), 20),
+        exclude_id=request.args.get('exclude_id', type=int)
+    )
+    for match in matches:
+        match['text'] = match['text'][:200]
+
+    return jsonify({"matches": matches})
+
+
+# Columns the listing API can return; `text` and `options` only on request
+LIST_FIELDS = {
+    'id': Question.id,
+    'topic_id': Question.topic_id,
+    'topic_code': Topic.code,
+    'question_type': Question.question_type,
+    'mark_value': Question.mark_value,
+    'difficulty': Question.difficulty,
+    'bloom_level': Question.bloom_level,
+    'active': Question.active,
+    'text_preview': func.substr(Question.text, 1, 120),
+    'text': Question.text,
+    'options': Question.options,
+}
+DEFAULT_LIST_FIELDS = [f for f in LIST_FIELDS if f not in ('text', 'options')]
+
+
+def _filters_from_args(args, course_id):
+    """Question filters shared by the listing, export and bulk status APIs."""
+    active = args.get('active')
+    return question_filters(
+        course_id=course_id,
+        topic_id=args.get('topic_id', type=int),
+        question_type=args.get('question_type') or None,
+        mark_value=args.get('mark_value', type=int),
+        difficulty=args.get('difficulty', type=int),
+        active=None if active in (None, '') else active in ('1', 'true'),
+        bloom_level=args.get('bloom_level') or None
+    )
+
+
+def _course_in_scope(course_id):
+    """Whether the logged-in user may manage questions of `course_id`."""
+    return course_id in current_scope()
+
+
+@questions_bp.route('/import', methods=['POST'])
+@login_required
+def import_questions_file():
+    """
+    Bulk import from an uploaded CSV or JSONL file. Rows are streamed,
+    validated and inserted in batches; the response is a per-row report.
+    """
+    if not verify_csrf_token():
+        return jsonify({"msg": "Invalid CSRF token"}), 400
+
+    course_id = request.form.get('course_id', type=int)
+    upload = request.files.get('file')
+
+    if not course_id or not upload or not upload.filename:
+        return jsonify({"msg": "Course and file are required"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({"msg": "Format must be csv or jsonl"}), 400
+
+    try:
+        report = import_questions(
+            course_id,
+            read_rows(upload.stream, fmt),
+            batch_size=current_app.config['QUESTION_IMPORT_BATCH_SIZE'],
+            max_errors=current_app.config['QUESTION_IMPORT_MAX_ERRORS']
+        )
+    except QuestionImportError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    return jsonify(report)
+
+
+@questions_bp.route('/export', methods=['GET'])
+@login_required
+def export_questions():
+    """
+    Stream a course's questions as CSV or JSONL (optionally gzipped),
+    filtered by topic, type, active flag and Bloom level.
+    """
+    course_id = request.args.get('course_id', type=int)
+    fmt = request.args.get('format', 'csv')
+    compress = request.args.get('gzip') in ('1', 'true')
+
+    if not course_id:
+        return jsonify({"msg": "Course is required"}), 400
+
+    if fmt not in MIMETYPES:
+        return jsonify({"msg": "Format must be csv or jsonl"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    filters = _filters_from_args(request.args, course_id)
+
+    filename = f"questions_course_{course_id}.{fmt}" + ('.gz' if compress else '')
+    return Response(
+        stream_with_context(iter_export(
+            filters, fmt, compress,
+            batch_size=current_app.config['QUESTION_EXPORT_BATCH_SIZE']
+        )),
+        mimetype='application/gzip' if compress else MIMETYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@questions_bp.route('/api', methods=['GET'])
+@login_required
+def list_questions_api():
+    """
+    Keyset-paginated question listing for one course, ordered by id.
+    `fields` selects the returned columns (comma separated); `cursor` is
+    the last id of the previous page.
+    """
+    course_id = request.args.get('course_id', type=int)
+    cursor = request.args.get('cursor', type=int)
+    limit = max(1, min(
+        request.args.get('limit', 50, type=int),
+        current_app.config['QUESTION_LIST_MAX_LIMIT']
+    ))
+
+    if not course_id:
+        return jsonify({"msg": "Course is required"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    fields = request.args.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else DEFAULT_LIST_FIELDS
+    unknown = [f for f in fields if f not in LIST_FIELDS]
+    if unknown:
+        return jsonify({"msg": f"Unknown fields: {', '.join(unknown)}"}), 400
+    if 'id' not in fields:
+        fields = ['id'] + fields
+
+    query = select(
+        *(LIST_FIELDS[f].label(f) for f in fields)
+    ).where(
+        *_filters_from_args(request.args, course_id)
+    )
+    if 'topic_code' in fields:
+        query = query.outerjoin(Topic, Topic.id == Question.topic_id)
+    if cursor:
+        query = query.where(Question.id > cursor)
+
+    rows = db.session.execute(
+        query.order_by(Question.id).limit(limit + 1)
+    ).mappings().all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        "questions": [dict(row) for row in rows],
+        "next_cursor": rows[-1]['id'] if has_more else None
+    })
+
+
+@questions_bp.route('/search', methods=['GET'])
+@login_required
+def search_questions_api():
+    """
+    Full-text search of one course's question text and MCQ options,
+    best match first. Takes the listing filters plus `q`, `limit` and
+    `offset`; `next_offset` is null on the last page.
+    """
+    course_id = request.args.get('course_id', type=int)
+    text = (request.args.get('q') or '').strip()
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = max(1, min(
+        request.args.get('limit', 50, type=int),
+        current_app.config['QUESTION_LIST_MAX_LIMIT']
+    ))
+
+    if not course_id or not text:
+        return jsonify({"msg": "Course and search text are required"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    hits, has_more = question_search.search(
+        course_id, text, _filters_from_args(request.args, course_id), limit=limit, offset=offset
+    )
+
+    rows = {}
+    if hits:
+        rows = {row['id']: dict(row) for row in db.session.execute(
+            select(*(LIST_FIELDS[f].label(f) for f in DEFAULT_LIST_FIELDS))
+            .outerjoin(Topic, Topic.id == Question.topic_id)
+            .where(Question.id.in_([question_id for question_id, _ in hits]))
+        ).mappings()}
+
+    return jsonify({
+        "questions": [
+            dict(rows[question_id], score=round(score, 4))
+            for question_id, score in hits if question_id in rows
+        ],
+        "backend": question_search.resolve_backend(),
+        "next_offset": offset + limit if has_more else None
+    })
+
+
+# Filters accepted by the bulk status API, with their JSON types
+BULK_FILTER_TYPES = {
+    'topic_id': int,
+    'question_type': str,
+    'mark_value': int,
+    'difficulty': int,
+    'bloom_level': str,
+}
+
+
+@questions_bp.route('/bulk-status', methods=['POST'])
+@login_required
+def bulk_set_status():
+    """
+    Activate or deactivate many questions of one course in a single
+    UPDATE. Takes a JSON body with `course_id`, `active` and either `ids`
+    or any of the listing filters (topic_id, question_type, mark_value,
+    difficulty, bloom_level).
+    """
+    if not verify_csrf_token():
+        return jsonify({"msg": "Invalid CSRF token"}), 400
+
+    data = request.get_json(silent=True) or {}
+    course_id = data.get('course_id')
+    active = data.get('active')
+    ids = data.get('ids')
+
+    if not isinstance(course_id, int) or not isinstance(active, bool):
+        return jsonify({"msg": "course_id and a boolean active are required"}), 400
+
+    if ids is not None and not (isinstance(ids, list) and all(isinstance(i, int) for i in ids)):
+        return jsonify({"msg": "ids must be a list of question ids"}), 400
+
+    # Each filter must have its column's type: a value that does not parse
+    # must not silently widen the update to the whole course
+    given = {}
+    for key, kind in BULK_FILTER_TYPES.items():
+        value = data.get(key)
+        if value in (None, ''):
+            continue
+        if not isinstance(value, kind) or isinstance(value, bool):
+            return jsonify({"msg": f"{key} must be {'an integer' if kind is int else 'a string'}"}), 400
+        given[key] = value
+
+    if not ids and not given:
+        return jsonify({"msg": "Question ids or at least one filter are required"}), 400
+
+    if not _course_in_scope(course_id):
+        return jsonify({"msg": "Forbidden"}), 403
+
+    filters = question_filters(course_id=course_id, **given)
+    if ids:
+        filters.append(Question.id.in_(ids))
+
+    record_status_change(filters, active)
+    affected = db.session.execute(
+        update(Question)
+        .where(*filters, or_(Question.active != active, Question.active.is_(None)))
+        .values(active=active)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+
+    # A bulk UPDATE bypasses the per-object session hooks
+    if affected:
+        pool_index.invalidate(course_id)
+
+    return jsonify({"affected": affected})
@@ -1,7 +1,153 @@
-from flask import session, redirect, url_for, flash, request
+from flask import session, redirect, url_for, flash, request, g
 from functools import wraps
 import secrets
-from ..models import Faculty
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import false, literal, select, union_all
+from sqlalchemy.orm import joinedload
+from ..extensions import db
+from ..models import Department, Faculty, SuperAdmin, normalize_email
+
+
+class Principal:
+    """
+    The logged-in user of the current request. Role, department and HOD
+    status are plain values captured at load time, so they stay valid
+    after commits expire the ORM objects.
+
+    Principals of bearer-token requests are built from the token claims
+    alone; their `user` object is only loaded if a view asks for it.
+    """
+
+    def __init__(self, role=None, user=None):
+        self.role = role if user is not None else None
+        self.user = user
+        self.id = user.id if user is not None else None
+        self.department_id = None
+        self.is_hod = False
+        self.via_token = False
+
+        if self.role == 'faculty':
+            self.department_id = user.department_id
+            self.is_hod = user.department is not None and user.department.hod_id == user.id
+
+    @classmethod
+    def from_claims(cls, identity, claims):
+        principal = cls()
+        principal.id = int(identity)
+        principal.role = claims.get('role')
+        principal.department_id = claims.get('department_id')
+        principal.is_hod = bool(claims.get('is_hod'))
+        principal.via_token = True
+        return principal
+
+    @classmethod
+    def from_identity(cls, identity):
+        """Principal of a `find_identity` row, for issuing token claims."""
+        principal = cls()
+        principal.id = identity.id
+        principal.role = identity.role
+        principal.department_id = identity.department_id
+        principal.is_hod = bool(identity.is_hod)
+        return principal
+
+    @property
+    def is_authenticated(self):
+        return self.id is not None and self.role is not None
+
+    @property
+    def is_super_admin(self):
+        return self.role == 'super_admin'
+
+    @property
+    def faculty(self):
+        if self.role != 'faculty':
+            return None
+        if self.user is None and self.id is not None:
+            self.user = db.session.get(Faculty, self.id)
+        return self.user
+
+
+def current_principal():
+    """
+    Principal for this request, resolved on first use and kept on
+    flask.g: from the bearer token's claims when an Authorization header
+    is sent (no query), otherwise from the session with one query (the
+    faculty's department is joined in).
+    """
+    if 'principal' not in g:
+        g.principal = _load_principal()
+    return g.principal
+
+
+def _load_principal():
+    if request.headers.get('Authorization', '').startswith('Bearer '):
+        # Invalid, expired or revoked tokens are rejected with a 401 here
+        verify_jwt_in_request()
+        return Principal.from_claims(get_jwt_identity(), get_jwt())
+
+    role = session.get('role')
+    user_id = session.get('user_id')
+
+    if user_id is None:
+        return Principal()
+
+    if role == 'super_admin':
+        return Principal(role, db.session.get(SuperAdmin, user_id))
+
+    if role == 'faculty':
+        faculty = Faculty.query.options(
+            joinedload(Faculty.department)
+        ).filter_by(id=user_id).first()
+        return Principal(role, faculty)
+
+    return Principal()
+
+
+def identity_query(email):
+    """
+    SELECT resolving an already normalized email to its account: a UNION
+    ALL of the super admin and faculty lookups, each answered from the
+    unique email index.
+    """
+    admins = select(
+        literal('super_admin').label('role'),
+        SuperAdmin.id,
+        SuperAdmin.password_hash,
+        literal(True).label('active'),
+        false().label('is_hod'),
+        literal(None, type_=db.Integer).label('department_id'),
+        literal(0).label('priority')
+    ).where(SuperAdmin.email == email)
+
+    faculty = select(
+        literal('faculty').label('role'),
+        Faculty.id,
+        Faculty.password_hash,
+        Faculty.active,
+        (Department.hod_id == Faculty.id).label('is_hod'),
+        Faculty.department_id,
+        literal(1).label('priority')
+    ).outerjoin(
+        Department, Department.id == Faculty.department_id
+    ).where(Faculty.email == email)
+
+    identities = union_all(admins, faculty).subquery()
+    return select(identities).order_by(identities.c.priority).limit(1)
+
+
+def find_identity(email):
+    """
+    Resolve an email to its account in one query.
+
+    Returns a row with role ('super_admin' or 'faculty'), id,
+    password_hash, active, is_hod and department_id, or None. Super
+    admin accounts win if the same email exists in both tables.
+    """
+    email = normalize_email(email)
+    if not email:
+        return None
+    return db.session.execute(identity_query(email)).first()
+
 
 def initialize_user_session(user_id, role):
     """
@@ -24,7 +170,7 @@ def initialize_user_session(user_id, role):
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
+        if not current_principal().is_authenticated:
             flash('You need to login first', 'error')
             return redirect(url_for('main.login'))
         return f(*args, **kwargs)
@@ -33,7 +179,7 @@ def login_required(f):
 def super_admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session or session.get('role') != 'super_admin':
+        if not current_principal().is_super_admin:
             flash('Access denied', 'error')
             return redirect(url_for('main.login'))
         return f(*args, **kwargs)
@@ -42,7 +188,7 @@ def super_admin_required(f):
 def faculty_login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'user_id' not in session or session.get('role') != 'faculty':
+        if current_principal().role != 'faculty':
             flash('You need to login first', 'error')
             return redirect(url_for('faculty_auth.faculty_login'))
         return f(*args, **kwargs)
@@ -50,6 +196,10 @@ def faculty_login_required(f):
 
 def verify_csrf_token():
     """Verify CSRF token from form or headers"""
+    # Bearer tokens are never sent automatically by the browser
+    if request.headers.get('Authorization', '').startswith('Bearer '):
+        return current_principal().via_token
+
     token = session.get('csrf_token')
     if not token:
         return False
@@ -60,11 +210,11 @@ def verify_csrf_token():
 def hod_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if session.get('role') != 'faculty':
+        principal = current_principal()
+        if principal.role != 'faculty':
             return redirect(url_for('main.login'))
 
-        faculty = Faculty.query.get(session.get('user_id'))
-        if not faculty or faculty.department.hod_id != faculty.id:
+        if not principal.is_hod:
             return redirect(url_for('faculty.faculty_dashboard'))
 
         return f(*args, **kwargs)
@@ -72,32 +222,28 @@ def hod_required(f):
     return decorated_function
 
 def get_current_user():
-    role = session.get('role')
-    user_id = session.get('user_id')
+    principal = current_principal()
 
-    if role == 'super_admin':
-        return role, None
+    if principal.role == 'super_admin':
+        return principal.role, None
 
-    if role == 'faculty':
-        faculty = Faculty.query.get(user_id)
-        return role, faculty
+    if principal.role == 'faculty':
+        return principal.role, principal.faculty
 
     return None, None
 
 def admin_or_hod_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        role = session.get('role')
+        principal = current_principal()
 
         # Super Admin allowed
-        if role == 'super_admin':
+        if principal.is_super_admin:
             return f(*args, **kwargs)
 
         # Faculty → check if HOD
-        if role == 'faculty':
-            faculty = Faculty.query.get(session.get('user_id'))
-            if faculty and faculty.department.hod_id == faculty.id:
-                return f(*args, **kwargs)
+        if principal.is_hod:
+            return f(*args, **kwargs)
 
         return redirect(url_for('main.login'))
 
@@ -0,0 +1,121 @@
+from collections import namedtuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from .cache import LRUCache
+
+
+CourseSummary = namedtuple('CourseSummary', 'id code title')
+
+# Changes to these models can move courses in or out of someone's scope
+# (offering assignments, HOD assignment, home department, deletions)
+SCOPE_MODELS = ('Course', 'ProgrammeCourseOffering', 'Department', 'Faculty', 'Programme')
+
+
+class CourseScope:
+    """Courses one principal may work with, as ids and (id, code, title) rows."""
+
+    def __init__(self, summaries):
+        self.courses = summaries
+        self.course_ids = frozenset(c.id for c in summaries)
+
+    def __contains__(self, course_id):
+        return course_id in self.course_ids
+
+    def __len__(self):
+        return len(self.course_ids)
+
+
+class CourseScopeService:
+    """
+    Per-user cache of the courses a principal may see.
+
+    Super admins see every course, HODs their department's courses and
+    other faculty the courses they are assigned through offerings. Scopes
+    are kept in an LRU map with COURSE_SCOPE_CACHE_TTL; any commit that
+    touches offerings, courses, departments, faculty or programmes clears
+    the map, and the TTL bounds staleness across worker processes.
+    """
+
+    def __init__(self, app=None):
+        self._scopes = LRUCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._scopes = LRUCache(
+            max_size=app.config.get('COURSE_SCOPE_CACHE_SIZE', 1024),
+            ttl=app.config.get('COURSE_SCOPE_CACHE_TTL', 300)
+        )
+
+        if not event.contains(Session, 'after_flush', _collect_scope_changes):
+            event.listen(Session, 'after_flush', _collect_scope_changes)
+            event.listen(Session, 'after_commit', _invalidate_scopes)
+            event.listen(Session, 'after_rollback', _discard_scope_changes)
+
+    def for_principal(self, principal):
+        """CourseScope of `principal` (empty when not logged in)."""
+        if principal.is_super_admin:
+            key = ('super_admin',)
+        elif principal.role == 'faculty':
+            key = ('hod', principal.department_id) if principal.is_hod else ('faculty', principal.id)
+        else:
+            return CourseScope([])
+
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = CourseScope(self._load(key))
+            self._scopes.set(key, scope)
+        return scope
+
+    def invalidate(self):
+        self._scopes.clear()
+
+    def _load(self, key):
+        from ..extensions import db
+        from ..models import Course, ProgrammeCourseOffering
+
+        query = select(Course.id, Course.code, Course.title).order_by(Course.code)
+
+        if key[0] == 'hod':
+            query = query.where(Course.home_department_id == key[1])
+        elif key[0] == 'faculty':
+            query = query.where(
+                Course.id.in_(
+                    select(ProgrammeCourseOffering.course_id)
+                    .where(ProgrammeCourseOffering.faculty_id == key[1])
+                )
+            )
+
+        return [CourseSummary(*row) for row in db.session.execute(query)]
+
+
+def current_scope():
+    """CourseScope of the logged-in user of this request."""
+    from ..extensions import course_scopes
+    from .auth import current_principal
+
+    return course_scopes.for_principal(current_principal())
+
+
+# =====================================================
+# SESSION EVENTS
+# =====================================================
+def _collect_scope_changes(session, flush_context):
+    if session.info.get('course_scope_dirty'):
+        return
+
+    for obj in session.new | session.dirty | session.deleted:
+        if type(obj).__name__ in SCOPE_MODELS:
+            session.info['course_scope_dirty'] = True
+            return
+
+
+def _invalidate_scopes(session):
+    from ..extensions import course_scopes
+
+    if session.info.pop('course_scope_dirty', False):
+        course_scopes.invalidate()
+
+
+def _discard_scope_changes(session):
+    session.info.pop('course_scope_dirty', None)
@@ -0,0 +1,145 @@
+import csv
+import io
+import multiprocessing
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import insert, select, union
+from werkzeug.security import generate_password_hash
+
+
+REQUIRED_COLUMNS = {'name', 'email', 'department'}
+GENERATED_PASSWORD_BYTES = 12
+
+
+class FacultyImportError(Exception):
+    """The file as a whole cannot be imported (row problems go in the report)."""
+
+
+def read_faculty_rows(stream):
+    """
+    Yield (line_number, row) from a binary CSV stream with name, email,
+    department and an optional password column.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    columns = {(c or '').strip().lower() for c in reader.fieldnames or []}
+    missing = REQUIRED_COLUMNS - columns
+    if missing:
+        raise FacultyImportError(f"Missing columns: {', '.join(sorted(missing))}")
+
+    for row in reader:
+        yield reader.line_num, {(k or '').strip().lower(): v for k, v in row.items()}
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    generate_password_hash for every password, spread over a pool of
+    `workers` processes (hashing is deliberately CPU-bound, so threads
+    would not help). One worker, or a single password, hashes inline.
+    """
+    passwords = list(passwords)
+    if not workers or workers <= 1 or len(passwords) <= 1:
+        return [generate_password_hash(p) for p in passwords]
+
+    workers = min(workers, len(passwords))
+    chunksize = max(1, len(passwords) // (workers * 4))
+    # Spawned (not forked) workers do not inherit the app's DB connections
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(generate_password_hash, passwords, chunksize=chunksize))
+
+
+def import_faculty(rows, department_ids=None, batch_size=500, max_errors=1000, workers=None):
+    """
+    Validate and create faculty accounts from `rows` (as yielded by
+    read_faculty_rows).
+
+    Departments are matched by id or name (case-insensitive) and limited
+    to `department_ids` when given. Emails are normalized and checked for
+    duplicates against both account tables in one query; passwords
+    missing from the file are generated and returned in `credentials`.
+    Hashing runs across a process pool, then accounts are written as
+    multi-row INSERTs of `batch_size`, committed batch by batch.
+    """
+    from ..extensions import db
+    from ..models import Department, Faculty, SuperAdmin, normalize_email
+
+    report = {'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False, 'credentials': []}
+
+    def fail(line_number, message):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'row': line_number, 'msg': message})
+        else:
+            report['errors_truncated'] = True
+
+    departments = {}  # str(id) and lowercased name → id
+    query = select(Department.id, Department.name)
+    if department_ids is not None:
+        query = query.where(Department.id.in_(department_ids))
+    for department_id, name in db.session.execute(query):
+        departments[str(department_id)] = department_id
+        departments[name.strip().lower()] = department_id
+
+    pending = []  # (line_number, values, password, generated)
+    seen = set()
+    try:
+        for line_number, row in rows:
+            name = (row.get('name') or '').strip()
+            email = normalize_email(row.get('email'))
+            department = (row.get('department') or '').strip().lower()
+            password = row.get('password') or ''
+
+            if not name or not email or not department:
+                fail(line_number, "Name, email and department are required")
+            elif '@' not in email:
+                fail(line_number, "Invalid email address")
+            elif department not in departments:
+                fail(line_number, "Unknown department")
+            elif email in seen:
+                fail(line_number, "Email appears more than once in the file")
+            else:
+                seen.add(email)
+                generated = not password
+                if generated:
+                    password = secrets.token_urlsafe(GENERATED_PASSWORD_BYTES)
+                pending.append((line_number, {
+                    'name': name,
+                    'email': email,
+                    'role': 'faculty',
+                    'department_id': departments[department],
+                }, password, generated))
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise FacultyImportError(f"Could not read file: {e}")
+
+    if pending:
+        # Existing super admin or faculty accounts with any of these emails
+        emails = [values['email'] for _, values, _, _ in pending]
+        existing = set(db.session.execute(union(
+            select(Faculty.email).where(Faculty.email.in_(emails)),
+            select(SuperAdmin.email).where(SuperAdmin.email.in_(emails))
+        )).scalars())
+
+        accepted = []
+        for entry in pending:
+            if entry[1]['email'] in existing:
+                fail(entry[0], "An account with this email already exists")
+            else:
+                accepted.append(entry)
+        pending = accepted
+
+    hashes = hash_passwords((password for _, _, password, _ in pending), workers)
+
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        db.session.execute(insert(Faculty), [
+            dict(values, password_hash=password_hash)
+            for (_, values, _, _), password_hash in zip(batch, hashes[start:start + batch_size])
+        ])
+        db.session.commit()
+        report['imported'] += len(batch)
+
+    report['errors'].sort(key=lambda error: error['row'])
+    report['credentials'] = [
+        {'email': values['email'], 'password': password}
+        for _, values, password, generated in pending if generated
+    ]
+    return report
@@ -0,0 +1,148 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy import or_, select, update
+import threading
+
+
+class GenerationJobRunner:
+    """
+    Runs paper generation outside the request on a local thread pool.
+
+    Job state lives in tbl_generation_jobs, so jobs that were queued or
+    running when a worker died are picked up again by the next process
+    that touches the runner (running jobs only once their heartbeat is
+    older than GENERATION_JOB_STALE_SECONDS).
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        self._recovered = False
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('GENERATION_JOB_WORKERS', 2),
+            thread_name_prefix='generation-job'
+        )
+        app.extensions['generation_jobs'] = self
+
+    def submit(self, course_id, topic_ids, created_by, variant_count=1, max_overlap=None):
+        from ..extensions import db
+        from ..models import GenerationJob
+
+        self.recover()
+
+        job = GenerationJob(
+            id=uuid4().hex,
+            course_id=course_id,
+            created_by=created_by,
+            topic_ids=topic_ids,
+            variant_count=variant_count,
+            max_overlap=max_overlap,
+            status='queued',
+            progress=0
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._executor.submit(self._run, job.id)
+        return job.id
+
+    def recover(self):
+        """Re-enqueue jobs left behind by a previous worker (once per process)."""
+        from ..extensions import db
+        from ..models import GenerationJob
+
+        with self._lock:
+            if self._recovered:
+                return
+            self._recovered = True
+
+        job_ids = db.session.execute(
+            select(GenerationJob.id).where(self._claimable())
+        ).scalars().all()
+
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+
+    # =====================================================
+    # WORKER
+    # =====================================================
+    def _claimable(self):
+        from ..models import GenerationJob
+
+        stale_before = datetime.utcnow() - timedelta(
+            seconds=self.app.config.get('GENERATION_JOB_STALE_SECONDS', 600)
+        )
+        return or_(
+            GenerationJob.status == 'queued',
+            (GenerationJob.status == 'running') & (GenerationJob.updated_at < stale_before)
+        )
+
+    def _claim(self, job_id):
+        from ..extensions import db
+        from ..models import GenerationJob
+
+        # Conditional UPDATE so only one worker ever runs a job
+        claimed = db.session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, self._claimable())
+            .values(status='running', updated_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        return claimed == 1
+
+    def _update(self, job_id, **values):
+        from ..extensions import db
+        from ..models import GenerationJob
+
+        db.session.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id)
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+
+    def _run(self, job_id):
+        from ..extensions import db
+        from ..models import GenerationJob
+        from .paper_generator import GenerationError, generate_papers
+
+        with self.app.app_context():
+            if not self._claim(job_id):
+                return
+
+            job = db.session.get(GenerationJob, job_id)
+
+            def on_progress(percent):
+                self._update(job_id, progress=percent)
+                db.session.commit()
+
+            try:
+                paper_ids, _ = generate_papers(
+                    job.course_id,
+                    job.topic_ids,
+                    job.created_by,
+                    variant_count=job.variant_count,
+                    max_overlap=job.max_overlap,
+                    on_progress=on_progress
+                )
+
+                # Papers and the final job state commit together
+                self._update(job_id, status='succeeded', progress=100, paper_ids=paper_ids)
+                db.session.commit()
+
+            except GenerationError as e:
+                db.session.rollback()
+                self._update(job_id, status='failed', error=str(e), shortfalls=e.shortfalls)
+                db.session.commit()
+
+            except Exception:
+                self.app.logger.exception("Generation job %s failed", job_id)
+                db.session.rollback()
+                self._update(job_id, status='failed', error="Unexpected error while generating")
+                db.session.commit()
@@ -0,0 +1,338 @@
+from collections import Counter
+from itertools import combinations
+from string import ascii_uppercase
+from flask import current_app
+import random
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload, load_only
+from ..extensions import db
+from ..models import CourseOutcome, GeneratedPaper, GeneratedPaperQuestion, Question, Template, Topic
+from .paper_solver import PaperConstraints, solve
+from .question_usage import load_exposure, record_usage
+
+
+class GenerationError(Exception):
+    """Generation could not produce a paper; `shortfalls` lists short sections."""
+
+    def __init__(self, message, shortfalls=None):
+        super().__init__(message)
+        self.shortfalls = shortfalls or []
+
+
+# =====================================================
+# SAMPLING
+# =====================================================
+def group_sections(sections):
+    """
+    Group template sections by the (question_type, mark_value) bucket they
+    draw from, so sections sharing a bucket never pick the same question.
+    """
+    groups = {}
+    for section in sections:
+        key = (section['question_type'], section['mark_per_question'])
+        groups.setdefault(key, []).append(
+            (section['section'], section['number_of_questions'])
+        )
+    return groups
+
+
+def section_availability(sections, available):
+    """
+    Per-section required vs. available counts. `available` maps
+    (question_type, mark_value) → number of candidates; sections sharing a
+    bucket are served in template order.
+    """
+    result = []
+    for (question_type, mark_value), members in group_sections(sections).items():
+        remaining = available.get((question_type, mark_value), 0)
+        for label, required in members:
+            result.append({
+                'section': label,
+                'question_type': question_type,
+                'mark_per_question': mark_value,
+                'required': required,
+                'available': max(remaining, 0)
+            })
+            remaining -= required
+
+    order = [s['section'] for s in sections]
+    result.sort(key=lambda r: order.index(r['section']))
+    return result
+
+
+def find_shortfalls(sections, available):
+    return [
+        s for s in section_availability(sections, available)
+        if s['available'] < s['required']
+    ]
+
+
+def shortfall_message(shortfall):
+    criteria = (
+        f"Section: {shortfall['section']}, "
+        f"Type: {shortfall['question_type']}, "
+        f"Marks: {shortfall['mark_per_question']}"
+    )
+    return (
+        f"Insufficient questions. Required: {shortfall['required']}, "
+        f"Available: {shortfall['available']} for criteria [{criteria}]"
+    )
+
+
+def sample_variants(pool, sections, topic_ids, count, rng,
+                    constraints=None, exposure=None):
+    """
+    Pick `count` paper variants with minimal overlap.
+
+    Each bucket's candidates are shuffled once and every variant starts
+    from the next window of that order, so questions are reused only after
+    the whole bucket has been handed out. When `constraints` are given each
+    window is then refined by paper_solver.solve. This is index arithmetic
+    over the in-memory pool, so it runs in-process even for large batches.
+
+    `exposure` is (use_counts, recent) from question_usage.load_exposure:
+    least used questions come first, and questions from recent papers are
+    left out whenever the bucket can spare them.
+    """
+    groups = group_sections(sections)
+    orders = {
+        key: pool.positions(key[0], key[1], topic_ids)
+        for key in groups
+    }
+
+    shortfalls = find_shortfalls(
+        sections, {key: len(positions) for key, positions in orders.items()}
+    )
+    if shortfalls:
+        return [], shortfalls
+
+    for key, positions in orders.items():
+        rng.shuffle(positions)
+        if exposure:
+            orders[key] = _prefer_unexposed(pool, positions, groups[key], count, exposure)
+
+    if constraints is not None and not constraints.active:
+        constraints = None
+
+    seed = rng.getrandbits(32)
+    variants = _build_variants(pool, orders, groups, range(count), count, constraints, seed)
+
+    labels = [s['section'] for s in sections]
+    return [{label: v[label] for label in labels} for v in variants], []
+
+
+def _prefer_unexposed(pool, positions, members, count, exposure):
+    use_counts, recent = exposure
+    ids = pool.ids
+    needed = sum(required for _, required in members) * count
+
+    fresh = [p for p in positions if ids[p] not in recent]
+    if len(fresh) >= needed:
+        positions = fresh
+
+    # Stable sort keeps the shuffle as tie-breaker between equal counts
+    positions.sort(key=lambda p: (ids[p] in recent, use_counts.get(ids[p], 0)))
+    return positions
+
+
+def _window(orders, groups, index):
+    """Initial picks of variant `index`: the next window of each bucket."""
+    picks = {}
+    for key, members in groups.items():
+        positions = orders[key]
+        needed = sum(required for _, required in members)
+        start = index * needed
+        picks[key] = [positions[(start + j) % len(positions)] for j in range(needed)]
+    return picks
+
+
+def _build_variants(pool, orders, groups, indices, count, constraints, seed):
+    held = None
+    if constraints is not None and count > 1:
+        # How many sets hold each question initially, so the solver can
+        # steer away from questions other sets already use
+        held = Counter(
+            p
+            for index in range(count)
+            for picks in _window(orders, groups, index).values()
+            for p in picks
+        )
+
+    variants = []
+    for index in indices:
+        picks = _window(orders, groups, index)
+
+        if constraints is not None:
+            usage = None
+            if held is not None:
+                own = Counter(p for ps in picks.values() for p in ps)
+                usage = {p: n - own[p] for p, n in held.items() if n > own[p]}
+            solve(pool, orders, picks, constraints, random.Random(seed + index), usage)
+
+        selection = {}
+        for key, members in groups.items():
+            ids = [pool.ids[p] for p in picks[key]]
+            offset = 0
+            for label, required in members:
+                selection[label] = ids[offset:offset + required]
+                offset += required
+        variants.append(selection)
+    return variants
+
+
+def max_pairwise_overlap(variants):
+    """Largest number of questions shared by any two variants."""
+    sets = [{qid for ids in v.values() for qid in ids} for v in variants]
+    return max((len(a & b) for a, b in combinations(sets, 2)), default=0)
+
+
+def variant_label(index):
+    """0 → 'A', 25 → 'Z', 26 → 'AA' ..."""
+    label = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        label = ascii_uppercase[rem] + label
+    return label
+
+
+# =====================================================
+# LOADING & PERSISTENCE
+# =====================================================
+def load_questions(question_ids):
+    """
+    Load the chosen questions in one query, with topic → CO joined so
+    co_satisfied needs no lazy loads. Inactive questions are skipped.
+    Only the metadata persisting a paper needs is read; question bodies
+    stay in the database.
+    """
+    return {
+        q.id: q
+        for q in Question.query.options(
+            load_only(Question.id, Question.mark_value, Question.topic_id),
+            joinedload(Question.topic).load_only(Topic.id, Topic.co_id)
+            .joinedload(Topic.co).load_only(CourseOutcome.id, CourseOutcome.code)
+        ).filter(
+            Question.id.in_(question_ids),
+            Question.active == True
+        )
+    }
+
+
+def co_weightages(selection, questions):
+    """Marks carried by each CO code in one paper selection."""
+    weightages = {}
+    for ids in selection.values():
+        for qid in ids:
+            q = questions[qid]
+            code = q.topic.co.code if q.topic and q.topic.co else "N/A"
+            weightages[code] = weightages.get(code, 0) + q.mark_value
+    return weightages
+
+
+def persist_papers(template, generated_by, selections, questions, labels=None):
+    """
+    Add one GeneratedPaper per selection plus all of their question rows
+    (as a single multi-row INSERT). The caller commits. Returns paper ids.
+    """
+    papers = [
+        GeneratedPaper(
+            course_id=template.course_id,
+            template_id=template.id,
+            total_marks=template.total_marks,
+            duration_minutes=template.duration_minutes,
+            generated_by=generated_by,
+            set_label=labels[i] if labels else None,
+            co_weightages_snapshot=co_weightages(selection, questions)
+        )
+        for i, selection in enumerate(selections)
+    ]
+    db.session.add_all(papers)
+    db.session.flush()  # Get paper ids
+
+    rows = []
+    for paper, selection in zip(papers, selections):
+        order = 1
+        for section_label, ids in selection.items():
+            for qid in ids:
+                q = questions[qid]
+                rows.append({
+                    'paper_id': paper.id,
+                    'question_id': q.id,
+                    'order': order,
+                    'mark_value': q.mark_value,
+                    'section_label': section_label,
+                    'co_satisfied': q.topic.co.code if q.topic and q.topic.co else "N/A"
+                })
+                order += 1
+
+    db.session.execute(insert(GeneratedPaperQuestion), rows)
+    return [p.id for p in papers]
+
+
+# =====================================================
+# ENTRY POINT
+# =====================================================
+def generate_papers(course_id, topic_ids, generated_by, variant_count=1,
+                    max_overlap=None, rng=None, on_progress=None):
+    """
+    Generate `variant_count` papers for a course from the active template
+    and add them to the session (the caller commits).
+
+    Selected topics include their subtopics. Returns (paper_ids, overlap)
+    or raises GenerationError. `on_progress(percent)` is called between
+    stages when given.
+    """
+    from ..extensions import pool_index, topic_tree
+
+    progress = on_progress or (lambda percent: None)
+    rng = rng or random.Random()
+
+    template = Template.query.filter_by(
+        course_id=course_id,
+        is_active=True
+    ).first()
+
+    if not template:
+        raise GenerationError("No active template found for this course")
+    progress(10)
+
+    variants, shortfalls = sample_variants(
+        pool_index.get(course_id),
+        template.categories,
+        topic_tree.subtree_ids(topic_ids),
+        variant_count,
+        rng,
+        constraints=PaperConstraints.for_template(template, current_app.config),
+        exposure=load_exposure(
+            course_id, current_app.config['QUESTION_EXPOSURE_EXCLUDE_LAST_K']
+        )
+    )
+
+    if shortfalls:
+        raise GenerationError(shortfall_message(shortfalls[0]), shortfalls)
+
+    overlap = max_pairwise_overlap(variants)
+    if max_overlap is not None and overlap > max_overlap:
+        raise GenerationError(
+            f"Not enough questions to keep overlap within {max_overlap}. "
+            f"Best achievable overlap between two sets is {overlap}."
+        )
+    progress(40)
+
+    chosen_ids = {qid for v in variants for ids in v.values() for qid in ids}
+    questions = load_questions(chosen_ids)
+
+    if len(questions) != len(chosen_ids):
+        # Pool changed in another worker since the index was built
+        pool_index.invalidate(course_id)
+        raise GenerationError("The question pool changed while generating. Please try again.")
+    progress(70)
+
+    labels = None
+    if variant_count > 1:
+        labels = [variant_label(i) for i in range(variant_count)]
+
+    paper_ids = persist_papers(template, generated_by, variants, questions, labels)
+    record_usage(course_id, zip(paper_ids, variants))
+    return paper_ids, overlap
@@ -0,0 +1,204 @@
+from time import perf_counter
+
+
+# Reusing a question another set already holds costs a little, so the
+# solver only does it when that buys a better constraint fit.
+REUSE_PENALTY = 1e-3
+
+# Stop after this many proposals in a row without improvement
+MAX_STALE_PROPOSALS = 4000
+
+
+class PaperConstraints:
+    """
+    Paper-wide targets for the constrained selection.
+
+    bloom_targets   {bloom_level: share of marks}, normalised to sum to 1
+    difficulty_band (low, high) mark-weighted average difficulty
+    min_co_share    minimum share of marks for every CO reachable from
+                    the selected topics (0–1)
+    time_budget     seconds the solver may spend per paper
+    """
+
+    def __init__(self, bloom_targets=None, difficulty_band=None,
+                 min_co_share=0.0, time_budget=0.2):
+        total = sum((bloom_targets or {}).values())
+        self.bloom_targets = {
+            level: share / total
+            for level, share in (bloom_targets or {}).items()
+        } if total else {}
+        self.difficulty_band = difficulty_band
+        self.min_co_share = min_co_share or 0.0
+        self.time_budget = time_budget
+
+    @classmethod
+    def for_template(cls, template, config):
+        return cls(
+            bloom_targets=template.bloom_distribution,
+            difficulty_band=config.get('PAPER_DIFFICULTY_BAND'),
+            min_co_share=config.get('PAPER_MIN_CO_SHARE', 0.0),
+            time_budget=config.get('PAPER_SOLVER_TIME_BUDGET', 0.2)
+        )
+
+    @property
+    def active(self):
+        return bool(self.bloom_targets or self.difficulty_band or self.min_co_share)
+
+
+class _Selection:
+    """Running mark totals per Bloom level / CO for the current selection."""
+
+    def __init__(self, pool, constraints, total_marks, co_ids):
+        self.pool = pool
+        self.constraints = constraints
+        self.total_marks = total_marks or 1
+        self.co_ids = co_ids
+        self.bloom_targets = [
+            constraints.bloom_targets.get(level, 0.0)
+            for level in pool.bloom_levels
+        ] if constraints.bloom_targets else None
+
+        self.bloom_marks = [0] * len(pool.bloom_levels)
+        self.co_marks = dict.fromkeys(co_ids, 0)
+        self.difficulty_marks = 0
+        self.reused = 0
+
+    def add(self, position, marks, reuse):
+        pool = self.pool
+        self.bloom_marks[pool.bloom[position]] += marks
+        self.co_marks[pool.co[position]] = self.co_marks.get(pool.co[position], 0) + marks
+        self.difficulty_marks += pool.difficulty[position] * marks
+        self.reused += reuse
+
+    def remove(self, position, marks, reuse):
+        self.add(position, -marks, -reuse)
+
+    def penalty(self):
+        total = self.total_marks
+        penalty = 0.0
+
+        if self.bloom_targets:
+            penalty += sum(
+                abs(marks / total - target)
+                for marks, target in zip(self.bloom_marks, self.bloom_targets)
+            )
+
+        band = self.constraints.difficulty_band
+        if band:
+            average = self.difficulty_marks / total
+            penalty += max(0.0, band[0] - average, average - band[1]) / 4
+
+        min_share = self.constraints.min_co_share
+        if min_share:
+            penalty += sum(
+                max(0.0, min_share - self.co_marks.get(co, 0) / total)
+                for co in self.co_ids
+            )
+
+        return penalty + self.reused * REUSE_PENALTY
+
+    def deficits(self):
+        """Bloom level / CO currently furthest below its target, if any."""
+        total = self.total_marks
+        worst_bloom, worst_bloom_gap = None, 0.0
+        if self.bloom_targets:
+            for level, (marks, target) in enumerate(zip(self.bloom_marks, self.bloom_targets)):
+                gap = target - marks / total
+                if gap > worst_bloom_gap:
+                    worst_bloom, worst_bloom_gap = level, gap
+
+        worst_co, worst_co_gap = None, 0.0
+        if self.constraints.min_co_share:
+            for co in self.co_ids:
+                gap = self.constraints.min_co_share - self.co_marks.get(co, 0) / total
+                if gap > worst_co_gap:
+                    worst_co, worst_co_gap = co, gap
+
+        return worst_bloom, worst_co
+
+
+def solve(pool, candidates, selection, constraints, rng, usage=None):
+    """
+    Improve `selection` in place by local search until it meets the
+    constraints, stops improving or runs out of time.
+
+    pool        CoursePool whose attribute arrays are indexed by position
+    candidates  {(question_type, mark_value): [positions]}
+    selection   {(question_type, mark_value): [positions]} initial picks
+    usage       {position: times held by other sets} for batch generation
+    """
+    usage = usage or {}
+    total_marks = sum(key[1] * len(picks) for key, picks in selection.items())
+    co_ids = sorted({
+        pool.co[p] for positions in candidates.values() for p in positions
+    }) if constraints.min_co_share else []
+
+    state = _Selection(pool, constraints, total_marks, co_ids)
+    chosen = set()
+    for (_, marks), picks in selection.items():
+        for p in picks:
+            state.add(p, marks, usage.get(p, 0))
+            chosen.add(p)
+
+    current = state.penalty()
+    if current == 0:
+        return selection
+
+    # Per-group lists of candidates by Bloom level and CO for guided moves
+    by_bloom = {}
+    by_co = {}
+    for key, positions in candidates.items():
+        blooms, cos = {}, {}
+        for p in positions:
+            blooms.setdefault(pool.bloom[p], []).append(p)
+            cos.setdefault(pool.co[p], []).append(p)
+        by_bloom[key], by_co[key] = blooms, cos
+
+    slots = [(key, i) for key, picks in selection.items() for i in range(len(picks))]
+    deadline = perf_counter() + constraints.time_budget
+    stale = 0
+    proposals = 0
+
+    while current > 0 and stale < MAX_STALE_PROPOSALS:
+        proposals += 1
+        if proposals % 64 == 0 and perf_counter() > deadline:
+            break
+
+        key, i = rng.choice(slots)
+        marks = key[1]
+        picks = selection[key]
+
+        # Half the moves target the worst deficit, the rest are random
+        pool_list = candidates[key]
+        if proposals % 2:
+            worst_bloom, worst_co = state.deficits()
+            if worst_co is not None and worst_co in by_co[key]:
+                pool_list = by_co[key][worst_co]
+            elif worst_bloom is not None and worst_bloom in by_bloom[key]:
+                pool_list = by_bloom[key][worst_bloom]
+
+        incoming = rng.choice(pool_list)
+        if incoming in chosen:
+            stale += 1
+            continue
+
+        outgoing = picks[i]
+        state.remove(outgoing, marks, usage.get(outgoing, 0))
+        state.add(incoming, marks, usage.get(incoming, 0))
+        proposed = state.penalty()
+
+        if proposed <= current:
+            if proposed < current:
+                stale = 0
+            else:
+                stale += 1
+            current = proposed
+            picks[i] = incoming
+            chosen.discard(outgoing)
+            chosen.add(incoming)
+        else:
+            state.remove(incoming, marks, usage.get(incoming, 0))
+            state.add(outgoing, marks, usage.get(outgoing, 0))
+            stale += 1
+
+    return selection
@@ -0,0 +1,175 @@
+from array import array
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from .cache import LRUCache
+
+
+# Attributes held in the index, per model
+INDEXED_FIELDS = {
+    'Question': (
+        'course_id', 'topic_id', 'question_type', 'mark_value',
+        'active', 'difficulty', 'bloom_level'
+    ),
+    'Topic': ('co_id',),
+    'CourseOutcome': ('code',),
+}
+
+
+class CoursePool:
+    """
+    Active questions of one course held as parallel compact arrays
+    (id, difficulty, bloom level, CO), with buckets keyed by
+    (question_type, mark_value, topic_id) → array of row positions.
+    """
+
+    def __init__(self, course_id):
+        self.course_id = course_id
+        self.ids = array('q')
+        self.difficulty = array('b')
+        self.bloom = array('b')   # index into bloom_levels
+        self.co = array('q')      # CourseOutcome id
+        self.bloom_levels = []
+        self.co_codes = {}
+        self.buckets = {}
+        self._bloom_codes = {}
+
+    def add(self, question_id, question_type, mark_value, topic_id,
+            difficulty, bloom_level, co_id, co_code):
+        bloom = self._bloom_codes.get(bloom_level)
+        if bloom is None:
+            bloom = self._bloom_codes[bloom_level] = len(self.bloom_levels)
+            self.bloom_levels.append(bloom_level)
+
+        self.co_codes[co_id] = co_code
+
+        key = (question_type, mark_value, topic_id)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = array('l')
+        bucket.append(len(self.ids))
+
+        self.ids.append(question_id)
+        self.difficulty.append(difficulty or 0)
+        self.bloom.append(bloom)
+        self.co.append(co_id)
+
+    def positions(self, question_type, mark_value, topic_ids):
+        positions = []
+        for topic_id in topic_ids:
+            positions.extend(self.buckets.get((question_type, mark_value, topic_id), ()))
+        return positions
+
+    def candidates(self, question_type, mark_value, topic_ids):
+        ids = self.ids
+        return [ids[p] for p in self.positions(question_type, mark_value, topic_ids)]
+
+    def count(self, question_type, mark_value, topic_ids):
+        return sum(
+            len(self.buckets.get((question_type, mark_value, topic_id), ()))
+            for topic_id in topic_ids
+        )
+
+
+class QuestionPoolIndex:
+    """
+    Process-local index of active question ids per course.
+
+    Pools are built lazily on first access with one narrow query and kept
+    in an LRU map capped at QUESTION_POOL_INDEX_MAX_COURSES. Commits that
+    add, move or toggle a Question drop the affected course; the TTL bounds
+    staleness for changes committed by other worker processes.
+    """
+
+    def __init__(self, app=None):
+        self._pools = LRUCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._pools = LRUCache(
+            max_size=app.config.get('QUESTION_POOL_INDEX_MAX_COURSES', 256),
+            ttl=app.config.get('QUESTION_POOL_INDEX_TTL', 300)
+        )
+
+        if not event.contains(Session, 'after_flush', _collect_dirty_courses):
+            event.listen(Session, 'after_flush', _collect_dirty_courses)
+            event.listen(Session, 'after_commit', _invalidate_dirty_courses)
+            event.listen(Session, 'after_rollback', _discard_dirty_courses)
+
+    def get(self, course_id):
+        pool = self._pools.get(course_id)
+        if pool is None:
+            pool = self._build(course_id)
+            self._pools.set(course_id, pool)
+        return pool
+
+    def invalidate(self, course_id=None):
+        if course_id is None:
+            self._pools.clear()
+        else:
+            self._pools.pop(course_id)
+
+    def _build(self, course_id):
+        from ..extensions import db
+        from ..models import CourseOutcome, Question, Topic
+
+        pool = CoursePool(course_id)
+        rows = db.session.execute(
+            select(
+                Question.id,
+                Question.question_type,
+                Question.mark_value,
+                Question.topic_id,
+                Question.difficulty,
+                Question.bloom_level,
+                Topic.co_id,
+                CourseOutcome.code
+            ).join(
+                Topic, Topic.id == Question.topic_id
+            ).join(
+                CourseOutcome, CourseOutcome.id == Topic.co_id
+            ).where(
+                Question.course_id == course_id,
+                Question.active == True
+            ).order_by(Question.id)
+        )
+        for row in rows:
+            pool.add(*row)
+        return pool
+
+
+# =====================================================
+# SESSION EVENTS
+# =====================================================
+def _collect_dirty_courses(session, flush_context):
+    from ..models import Question
+
+    dirty = session.info.setdefault('pool_index_dirty', set())
+
+    for obj in session.new | session.deleted:
+        if isinstance(obj, Question):
+            dirty.add(obj.course_id)
+
+    for obj in session.dirty:
+        fields = INDEXED_FIELDS.get(type(obj).__name__)
+        if not fields:
+            continue
+
+        state = inspect(obj)
+        if any(state.attrs[f].history.has_changes() for f in fields):
+            dirty.add(obj.course_id)
+
+        # A question moved to another course leaves its old pool stale too
+        if isinstance(obj, Question):
+            dirty.update(state.attrs.course_id.history.deleted)
+
+
+def _invalidate_dirty_courses(session):
+    from ..extensions import pool_index
+
+    for course_id in session.info.pop('pool_index_dirty', ()):
+        pool_index.invalidate(course_id)
+
+
+def _discard_dirty_courses(session):
+    session.info.pop('pool_index_dirty', None)
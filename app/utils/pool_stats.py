@@ -0,0 +1,276 @@
+from collections import Counter
+from sqlalchemy import delete, event, func, inspect, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.orm import Session
+
+
+# Dimensions of one statistics cell, in primary key order
+STAT_FIELDS = (
+    'course_id', 'topic_id', 'question_type', 'mark_value',
+    'bloom_level', 'difficulty', 'active'
+)
+
+
+def stat_key(values):
+    """Cell of a question, from a dict of column values (NULL active counts as inactive)."""
+    return tuple(values[f] for f in STAT_FIELDS[:-1]) + (bool(values['active']),)
+
+
+class QuestionPoolStats:
+    """
+    Question counts by course × topic × type × mark × Bloom level ×
+    difficulty × active, materialized in tbl_question_pool_stats.
+
+    ORM changes to questions are folded in by a before_flush hook, inside
+    the same transaction; Core bulk writes report theirs through
+    record_inserted / record_status_change. Reads touch only the cells of
+    one course, however many questions it holds.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not event.contains(Session, 'before_flush', _track_question_changes):
+            event.listen(Session, 'before_flush', _track_question_changes)
+
+    # =====================================================
+    # READS
+    # =====================================================
+    def counts(self, course_id, topic_ids=None, active=True):
+        """{(question_type, mark_value): count} for a course, optionally by topics."""
+        from ..extensions import db
+        from ..models import QuestionPoolStat as S
+
+        query = select(
+            S.question_type, S.mark_value, func.sum(S.question_count)
+        ).where(
+            S.course_id == course_id, S.active == active
+        ).group_by(S.question_type, S.mark_value)
+        if topic_ids is not None:
+            query = query.where(S.topic_id.in_(topic_ids))
+
+        return {(t, m): int(n) for t, m, n in db.session.execute(query) if n}
+
+    def course_totals(self, course_ids):
+        """{course_id: (active, inactive)} question totals for the given courses."""
+        from ..extensions import db
+        from ..models import QuestionPoolStat as S
+
+        totals = {course_id: [0, 0] for course_id in course_ids}
+        for course_id, active, n in db.session.execute(
+            select(S.course_id, S.active, func.sum(S.question_count))
+            .where(S.course_id.in_(totals))
+            .group_by(S.course_id, S.active)
+        ):
+            totals[course_id][0 if active else 1] = int(n or 0)
+        return {course_id: tuple(t) for course_id, t in totals.items()}
+
+    def cells(self, course_id):
+        """Every non-empty cell of a course as dicts (STAT_FIELDS + count)."""
+        from ..extensions import db
+        from ..models import QuestionPoolStat as S
+
+        rows = db.session.execute(
+            select(*(getattr(S, f) for f in STAT_FIELDS), S.question_count.label('count'))
+            .where(S.course_id == course_id, S.question_count > 0)
+            .order_by(S.topic_id, S.question_type, S.mark_value, S.bloom_level, S.difficulty)
+        ).mappings()
+        return [dict(row) for row in rows]
+
+    def health(self, course_id, sections):
+        """
+        Pool-health summary of a course from its cells: active/inactive
+        totals, active counts per topic and per (type, mark) kind, Bloom
+        level and difficulty spreads, and template sections' required vs.
+        available counts.
+        """
+        from .paper_generator import section_availability
+
+        totals = {'active': 0, 'inactive': 0}
+        kinds, by_topic, bloom, difficulty = Counter(), {}, Counter(), Counter()
+
+        for cell in self.cells(course_id):
+            if not cell['active']:
+                totals['inactive'] += cell['count']
+                continue
+
+            kind = (cell['question_type'], cell['mark_value'])
+            totals['active'] += cell['count']
+            kinds[kind] += cell['count']
+            by_topic.setdefault(cell['topic_id'], Counter())[kind] += cell['count']
+            bloom[cell['bloom_level']] += cell['count']
+            difficulty[cell['difficulty']] += cell['count']
+
+        return {
+            'totals': totals,
+            'kinds': kinds,
+            'topics': by_topic,
+            'bloom_levels': bloom,
+            'difficulty': difficulty,
+            'sections': section_availability(sections, kinds) if sections else [],
+        }
+
+    # =====================================================
+    # RECONCILIATION
+    # =====================================================
+    def rebuild(self, course_id=None):
+        """
+        Recount from tbl_questions in one GROUP BY pass, for one course or
+        all of them. Returns the number of cells written. Runs in the
+        caller's transaction.
+        """
+        from ..extensions import db
+        from ..models import QuestionPoolStat as S
+
+        clear = delete(S)
+        if course_id is not None:
+            clear = clear.where(S.course_id == course_id)
+        source = _recount(course_id)
+
+        db.session.execute(clear)
+        return db.session.execute(
+            S.__table__.insert().from_select(list(STAT_FIELDS) + ['question_count'], source)
+        ).rowcount
+
+
+    def drift(self, course_id=None):
+        """[(cell, stored, actual)] for every cell whose stored count is wrong."""
+        from ..extensions import db
+        from ..models import QuestionPoolStat as S
+
+        stored_query = select(*(getattr(S, f) for f in STAT_FIELDS), S.question_count)
+        if course_id is not None:
+            stored_query = stored_query.where(S.course_id == course_id)
+
+        stored = {tuple(row[:-1]): row[-1] for row in db.session.execute(stored_query)}
+        actual = {stat_key(dict(zip(STAT_FIELDS, row[:-1]))): row[-1]
+                  for row in db.session.execute(_recount(course_id))}
+
+        return [
+            (cell, stored.get(cell, 0), actual.get(cell, 0))
+            for cell in sorted(stored.keys() | actual.keys(), key=repr)
+            if stored.get(cell, 0) != actual.get(cell, 0)
+        ]
+
+
+def _recount(course_id=None):
+    """SELECT of the true cell counts, straight from tbl_questions."""
+    from ..models import Question
+
+    columns = [getattr(Question, f) for f in STAT_FIELDS[:-1]]
+    active = func.coalesce(Question.active, False)
+
+    query = select(*columns, active, func.count(Question.id)).group_by(*columns, active)
+    if course_id is not None:
+        query = query.where(Question.course_id == course_id)
+    return query
+
+
+# =====================================================
+# INCREMENTAL UPDATES
+# =====================================================
+def apply_deltas(deltas, connection=None):
+    """Add {cell: delta} to the statistics table with one upsert."""
+    from ..extensions import db
+    from ..models import QuestionPoolStat
+
+    rows = [
+        dict(zip(STAT_FIELDS, key), question_count=delta)
+        for key, delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+
+    connection = connection or db.session.connection()
+    table = QuestionPoolStat.__table__
+    dialect = connection.dialect.name
+
+    if dialect == 'mysql':
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            question_count=table.c.question_count + stmt.inserted.question_count
+        )
+    else:
+        stmt = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[f] for f in STAT_FIELDS],
+            set_={'question_count': table.c.question_count + stmt.excluded.question_count}
+        )
+
+    connection.execute(stmt, rows)
+
+
+def record_inserted(rows):
+    """Count questions written by a Core INSERT (dicts of column values)."""
+    apply_deltas(Counter(stat_key(row) for row in rows))
+
+
+def record_status_change(filters, active):
+    """
+    Move the questions matching `filters` that are about to be set to
+    `active` between cells. Call before the bulk UPDATE, in the same
+    transaction. NULL active is already counted as inactive.
+    """
+    from ..extensions import db
+    from ..models import Question
+
+    columns = [getattr(Question, f) for f in STAT_FIELDS[:-1]]
+    deltas = Counter()
+    for row in db.session.execute(
+        select(*columns, func.count(Question.id))
+        .where(*filters, func.coalesce(Question.active, False) != active)
+        .group_by(*columns)
+    ):
+        *key, n = row
+        deltas[tuple(key) + (not active,)] -= n
+        deltas[tuple(key) + (active,)] += n
+
+    apply_deltas(deltas)
+
+
+# =====================================================
+# SESSION EVENTS
+# =====================================================
+def _track_question_changes(session, flush_context, instances):
+    from ..models import Question
+
+    deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Question):
+            values = {f: getattr(obj, f) for f in STAT_FIELDS}
+            if values['active'] is None:
+                values['active'] = True  # column default, applied on INSERT
+            deltas[stat_key(values)] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            deltas[stat_key({f: getattr(obj, f) for f in STAT_FIELDS})] -= 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Question):
+            continue
+
+        state = inspect(obj)
+        histories = {f: state.attrs[f].history for f in STAT_FIELDS}
+        if not any(h.has_changes() for h in histories.values()):
+            continue
+
+        new = {f: getattr(obj, f) for f in STAT_FIELDS}
+        if any(h.added and not h.deleted for h in histories.values()):
+            # Set while expired: the old values are only in the database
+            old = session.connection().execute(
+                select(*(getattr(Question, f) for f in STAT_FIELDS))
+                .where(Question.id == obj.id)
+            ).mappings().one()
+        else:
+            old = {f: h.deleted[0] if h.deleted else new[f] for f, h in histories.items()}
+        deltas[stat_key(old)] -= 1
+        deltas[stat_key(new)] += 1
+
+    if any(deltas.values()):
+        apply_deltas(deltas, session.connection())
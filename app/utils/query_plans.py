@@ -0,0 +1,146 @@
+import re
+from sqlalchemy import func, select, text
+
+
+# Placeholder id used for every lookup; plans do not depend on the value
+SAMPLE_ID = 1
+
+# Dialects whose plans explain() can read
+EXPLAIN_DIALECTS = ('sqlite', 'mysql', 'mariadb')
+
+
+def hot_queries():
+    """
+    (name, statement) for the queries on the hot request paths. They
+    mirror the statements issued by the routes and utils, with SAMPLE_ID
+    in place of real ids.
+    """
+    from .auth import identity_query
+    from ..models import (
+        CourseOutcome, GeneratedPaper, GeneratedPaperQuestion,
+        ProgrammeCourseOffering, Question, QuestionPoolStat, QuestionUsage, Template, Topic, TopicClosure
+    )
+
+    return [
+        ('question pool build', select(
+            Question.id, Question.question_type, Question.mark_value,
+            Question.topic_id, Question.difficulty, Question.bloom_level,
+            Topic.co_id, CourseOutcome.code
+        ).join(
+            Topic, Topic.id == Question.topic_id
+        ).join(
+            CourseOutcome, CourseOutcome.id == Topic.co_id
+        ).where(
+            Question.course_id == SAMPLE_ID, Question.active == True
+        ).order_by(Question.id)),
+
+        ('generation feasibility', select(
+            QuestionPoolStat.question_type, QuestionPoolStat.mark_value,
+            func.sum(QuestionPoolStat.question_count)
+        ).where(
+            QuestionPoolStat.course_id == SAMPLE_ID,
+            QuestionPoolStat.active == True,
+            QuestionPoolStat.topic_id.in_([SAMPLE_ID, SAMPLE_ID + 1])
+        ).group_by(QuestionPoolStat.question_type, QuestionPoolStat.mark_value)),
+
+        ('question listing by topic', select(
+            Question.id, Question.question_type, Question.mark_value
+        ).where(
+            Question.course_id == SAMPLE_ID,
+            Question.topic_id.in_(
+                select(TopicClosure.descendant_id).where(TopicClosure.ancestor_id == SAMPLE_ID)
+            ),
+            Question.id > SAMPLE_ID
+        ).order_by(Question.id).limit(51)),
+
+        ('topic subtree', select(TopicClosure.descendant_id).where(
+            TopicClosure.ancestor_id.in_([SAMPLE_ID, SAMPLE_ID + 1])
+        ).distinct()),
+
+        ('active template', select(Template.id).where(
+            Template.course_id == SAMPLE_ID, Template.is_active == True
+        )),
+
+        ('faculty course scope', select(ProgrammeCourseOffering.course_id).where(
+            ProgrammeCourseOffering.faculty_id == SAMPLE_ID
+        )),
+
+        ('programme semester offerings', select(ProgrammeCourseOffering.id).where(
+            ProgrammeCourseOffering.programme_id == SAMPLE_ID,
+            ProgrammeCourseOffering.semester_no == 1
+        )),
+
+        ('paper history by course', select(GeneratedPaper.id).where(
+            GeneratedPaper.course_id == SAMPLE_ID
+        ).order_by(
+            GeneratedPaper.created_at.desc(), GeneratedPaper.id.desc()
+        ).limit(51)),
+
+        ('paper history by generator', select(GeneratedPaper.id).where(
+            GeneratedPaper.generated_by == SAMPLE_ID
+        ).order_by(
+            GeneratedPaper.created_at.desc(), GeneratedPaper.id.desc()
+        ).limit(51)),
+
+        ('paper questions', select(GeneratedPaperQuestion.question_id).where(
+            GeneratedPaperQuestion.paper_id == SAMPLE_ID
+        ).order_by(GeneratedPaperQuestion.order)),
+
+        ('login identity lookup', identity_query('sample@example.com')),
+
+        ('question exposure', select(QuestionUsage.question_id, QuestionUsage.use_count).where(
+            QuestionUsage.course_id == SAMPLE_ID
+        )),
+    ]
+
+
+def explain(statement):
+    """
+    Query plan of `statement` as (table, detail, full_scan) tuples, using
+    EXPLAIN QUERY PLAN on SQLite and EXPLAIN on MySQL/MariaDB. None on
+    other dialects.
+    """
+    from ..extensions import db
+
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        plan = []
+        for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql)):
+            detail = row[3]
+            scan = re.match(r'SCAN (?:TABLE )?(\w+)', detail)
+            table = scan.group(1) if scan else None
+            # "SCAN t USING [COVERING] INDEX" walks an index, not the table,
+            # and scans of subqueries (anon_N) only read their few rows
+            plan.append((
+                table,
+                detail,
+                table in db.metadata.tables and 'INDEX' not in detail
+            ))
+        return plan
+
+    if dialect.name in ('mysql', 'mariadb'):
+        return [
+            (row['table'], f"type={row['type']} key={row['key']} rows={row['rows']}", row['type'] == 'ALL')
+            for row in db.session.execute(text('EXPLAIN ' + sql)).mappings()
+        ]
+
+    return None
+
+
+def check_query_plans():
+    """
+    [(name, plan, full_scan_tables)] for every hot query, or None when
+    the database's plans cannot be read (see EXPLAIN_DIALECTS).
+    """
+    from ..extensions import db
+
+    if db.engine.dialect.name not in EXPLAIN_DIALECTS:
+        return None
+
+    results = []
+    for name, statement in hot_queries():
+        plan = explain(statement)
+        results.append((name, plan, [table for table, _, full in plan if full]))
+    return results
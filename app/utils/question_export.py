@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+import zlib
+from sqlalchemy import select
+
+
+# Same columns the bulk import reads, so an export can be re-imported
+EXPORT_COLUMNS = [
+    'id', 'topic_id', 'topic_code', 'text', 'question_type', 'mark_value',
+    'difficulty', 'bloom_level', 'active',
+    'option_1', 'option_2', 'option_3', 'option_4'
+]
+
+MIMETYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def question_filters(course_id=None, topic_id=None, question_type=None,
+                     mark_value=None, difficulty=None, active=None, bloom_level=None):
+    """
+    WHERE clauses on Question for the given filters (None = not filtered).
+    `topic_id` matches the topic and every topic under it.
+    """
+    from ..extensions import topic_tree
+    from ..models import Question
+
+    clauses = []
+    if course_id is not None:
+        clauses.append(Question.course_id == course_id)
+    if topic_id is not None:
+        clauses.append(Question.topic_id.in_(topic_tree.subtree_select(topic_id)))
+    if question_type:
+        clauses.append(Question.question_type == question_type)
+    if mark_value is not None:
+        clauses.append(Question.mark_value == mark_value)
+    if difficulty is not None:
+        clauses.append(Question.difficulty == difficulty)
+    if active is not None:
+        clauses.append(Question.active == active)
+    if bloom_level:
+        clauses.append(Question.bloom_level == bloom_level)
+    return clauses
+
+
+def iter_questions(filters, batch_size=1000):
+    """
+    Yield export rows as dicts, streamed from the database `batch_size`
+    rows at a time (server-side cursor where the driver supports one).
+    """
+    from ..extensions import db
+    from ..models import Question, Topic
+
+    result = db.session.execute(
+        select(
+            Question.id,
+            Question.topic_id,
+            Topic.code,
+            Question.text,
+            Question.question_type,
+            Question.mark_value,
+            Question.difficulty,
+            Question.bloom_level,
+            Question.active,
+            Question.options
+        ).outerjoin(
+            Topic, Topic.id == Question.topic_id
+        ).where(
+            *filters
+        ).order_by(Question.id).execution_options(yield_per=batch_size)
+    )
+
+    try:
+        for row in result:
+            yield {
+                'id': row.id,
+                'topic_id': row.topic_id,
+                'topic_code': row.code,
+                'text': row.text,
+                'question_type': row.question_type,
+                'mark_value': row.mark_value,
+                'difficulty': row.difficulty,
+                'bloom_level': row.bloom_level,
+                'active': bool(row.active),
+                'options': row.options,
+            }
+    finally:
+        result.close()
+
+
+def iter_csv(records, rows_per_chunk=500):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+
+    for n, record in enumerate(records, start=1):
+        options = record.pop('options') or []
+        for i in range(4):
+            record[f'option_{i + 1}'] = options[i] if i < len(options) else ''
+        writer.writerow(record)
+
+        if n % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def iter_jsonl(records, rows_per_chunk=500):
+    lines = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False))
+        if len(lines) == rows_per_chunk:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def iter_export(filters, fmt, compress=False, batch_size=1000):
+    """Encoded export chunks (bytes), gzip-compressed on the fly if asked."""
+    serialize = iter_csv if fmt == 'csv' else iter_jsonl
+    chunks = (chunk.encode('utf-8') for chunk in serialize(iter_questions(filters, batch_size)))
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 → gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,233 @@
+import csv
+import io
+import json
+from sqlalchemy import func, insert, select
+
+
+QUESTION_TYPES = {'mcq', 'descriptive'}
+MCQ_OPTION_COUNT = 4
+DIFFICULTY_RANGE = range(1, 6)
+
+
+class QuestionImportError(Exception):
+    """The file as a whole cannot be imported (row problems go in the report)."""
+
+
+def detect_format(filename, default='csv'):
+    """'jsonl' for .jsonl/.ndjson files, otherwise `default`."""
+    name = (filename or '').lower()
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, row, error) one row at a time from a binary
+    stream. `row` is a dict, or None with `error` set when the line cannot
+    be parsed.
+    """
+    stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
+
+
+class QuestionRowValidator:
+    """
+    Checks import rows against a course's active template and topic → CO
+    mapping. Lookups are loaded once, so validation issues no queries.
+    """
+
+    def __init__(self, course_id):
+        from ..extensions import db
+        from ..models import CourseOutcome, Template, Topic
+
+        self.course_id = course_id
+
+        template = db.session.execute(
+            select(Template.categories).where(
+                Template.course_id == course_id,
+                Template.is_active == True
+            )
+        ).scalar()
+        self.has_template = template is not None
+        self.allowed = {
+            (s['question_type'], s['mark_per_question'])
+            for s in template or []
+        }
+
+        self.topics = {}       # topic id → bloom level of its CO (None if no CO)
+        self.topic_codes = {}  # topic code → topic id
+        for topic_id, code, bloom_level in db.session.execute(
+            select(Topic.id, Topic.code, CourseOutcome.bloom_level)
+            .outerjoin(CourseOutcome, CourseOutcome.id == Topic.co_id)
+            .where(Topic.course_id == course_id)
+        ):
+            self.topics[topic_id] = bloom_level
+            if code:
+                self.topic_codes[str(code).strip()] = topic_id
+
+    def validate(self, row):
+        """Return (values for an INSERT, None) or (None, error message)."""
+        topic_id = _int(row.get('topic_id'))
+        if topic_id is None and row.get('topic_code'):
+            topic_id = self.topic_codes.get(str(row['topic_code']).strip())
+        if topic_id not in self.topics:
+            return None, "Unknown topic for this course"
+
+        bloom_level = self.topics[topic_id]
+        if not bloom_level:
+            return None, "Topic does not have an associated Course Outcome with Bloom Level"
+
+        text = _str(row.get('text'))
+        if text is None:
+            return None, "Question text must be a string"
+        if not text:
+            return None, "Question text is required"
+
+        question_type = _str(row.get('question_type'))
+        if question_type is None:
+            return None, "Question type must be a string"
+        question_type = question_type.lower()
+        if question_type not in QUESTION_TYPES:
+            return None, f"Question type must be one of {', '.join(sorted(QUESTION_TYPES))}"
+
+        mark_value = _int(row.get('mark_value'))
+        if mark_value is None:
+            return None, "Mark value must be a whole number"
+
+        if (question_type, mark_value) not in self.allowed:
+            return None, f"{question_type} questions of {mark_value} marks are not allowed by template"
+
+        difficulty = _int(row.get('difficulty'))
+        if difficulty not in DIFFICULTY_RANGE:
+            return None, "Difficulty must be between 1 and 5"
+
+        options = None
+        if question_type == 'mcq':
+            options = row.get('options')
+            if options is None:
+                options = [row.get(f'option_{i}') for i in range(1, MCQ_OPTION_COUNT + 1)]
+            if not isinstance(options, list) or len(options) != MCQ_OPTION_COUNT \
+                    or not all(isinstance(o, str) and o.strip() for o in options):
+                return None, f"All {MCQ_OPTION_COUNT} options required for MCQ"
+
+        return {
+            'course_id': self.course_id,
+            'topic_id': topic_id,
+            'text': text,
+            'question_type': question_type,
+            'mark_value': mark_value,
+            'difficulty': difficulty,
+            'bloom_level': bloom_level,
+            'options': options,
+            'active': True,
+        }, None
+
+
+def import_questions(course_id, rows, batch_size=1000, max_errors=1000):
+    """
+    Validate and insert questions from `rows` (as yielded by read_rows).
+
+    Valid rows are written as multi-row INSERTs of `batch_size` and
+    committed batch by batch, so memory stays flat whatever the input
+    size. Only the first `max_errors` row errors are kept in the report;
+    `failed` still counts all of them.
+    """
+    from ..extensions import db, pool_index, question_search, similarity_index
+    from ..models import Question
+    from .pool_stats import record_inserted
+
+    validator = QuestionRowValidator(course_id)
+    report = {'imported': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+
+    if not validator.has_template:
+        raise QuestionImportError("Template must exist before adding questions")
+
+    def fail(line_number, message):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'row': line_number, 'msg': message})
+        else:
+            report['errors_truncated'] = True
+
+    def write(batch):
+        last_id = db.session.execute(select(func.max(Question.id))).scalar() or 0
+        db.session.execute(insert(Question), batch)
+        record_inserted(batch)
+        similarity_index.index_new(course_id, after_id=last_id)
+        question_search.index_new(course_id, after_id=last_id)
+        db.session.commit()
+        report['imported'] += len(batch)
+
+    batch = []
+    try:
+        for line_number, row, error in rows:
+            if error is None:
+                values, error = validator.validate(row)
+            if error is not None:
+                fail(line_number, error)
+                continue
+
+            batch.append(values)
+            if len(batch) >= batch_size:
+                write(batch)
+                batch = []
+
+        if batch:
+            write(batch)
+
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        raise QuestionImportError(
+            f"Could not read file after importing {report['imported']} questions: {e}"
+        )
+
+    finally:
+        # Core INSERTs bypass the session events that keep the index fresh
+        # (pool statistics, similarity and search documents are written per batch)
+        if report['imported']:
+            pool_index.invalidate(course_id)
+            question_search.invalidate(course_id)
+
+    return report
+
+
+def _str(value):
+    """Stripped string value ('' when missing), or None if it is not a string."""
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        return None
+    return value.strip()
+
+
+def _int(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,352 @@
+import math
+import re
+from array import array
+from sqlalchemy import column, delete, event, exists, func, insert, inspect, literal_column, select, table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from .cache import LRUCache
+
+
+BACKENDS = ('fulltext', 'fts5', 'memory')
+
+# Longest search text considered, in terms
+MAX_QUERY_TERMS = 16
+
+# BM25 parameters of the in-process fallback (FTS5's defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# External-content FTS5 table over tbl_question_search, kept in step by
+# triggers (the pattern from the SQLite FTS5 documentation)
+SQLITE_FTS_TABLE = 'tbl_question_search_fts'
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tbl_question_search_fts USING fts5("
+    "body, course_id, content='tbl_question_search', content_rowid='question_id')",
+    "CREATE TRIGGER IF NOT EXISTS tbl_question_search_ai AFTER INSERT ON tbl_question_search BEGIN "
+    "INSERT INTO tbl_question_search_fts(rowid, body, course_id) "
+    "VALUES (new.question_id, new.body, new.course_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tbl_question_search_ad AFTER DELETE ON tbl_question_search BEGIN "
+    "INSERT INTO tbl_question_search_fts(tbl_question_search_fts, rowid, body, course_id) "
+    "VALUES ('delete', old.question_id, old.body, old.course_id); END",
+    "CREATE TRIGGER IF NOT EXISTS tbl_question_search_au AFTER UPDATE ON tbl_question_search BEGIN "
+    "INSERT INTO tbl_question_search_fts(tbl_question_search_fts, rowid, body, course_id) "
+    "VALUES ('delete', old.question_id, old.body, old.course_id); "
+    "INSERT INTO tbl_question_search_fts(rowid, body, course_id) "
+    "VALUES (new.question_id, new.body, new.course_id); END",
+)
+
+
+def search_body(text, options):
+    """Searchable text of a question: its text followed by any MCQ options."""
+    parts = [text or '']
+    if options:
+        parts.extend(str(o) for o in options if o)
+    return '\n'.join(parts)
+
+
+def terms(text):
+    """Lower-cased word terms of a text, in order."""
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def document_row(question_id, course_id, text, options):
+    return {'question_id': question_id, 'course_id': course_id, 'body': search_body(text, options)}
+
+
+def create_sqlite_fts(target, connection, **kw):
+    """after_create hook of tbl_question_search: add the FTS5 index on SQLite."""
+    if connection.dialect.name != 'sqlite':
+        return
+    try:
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+    except OperationalError:
+        # SQLite built without FTS5: searches use the in-process index
+        pass
+
+
+class CourseTextIndex:
+    """
+    Inverted index of one course's search documents: term → parallel
+    arrays of document positions and term frequencies, ranked with BM25.
+    """
+
+    def __init__(self, course_id):
+        self.course_id = course_id
+        self.ids = array('q')
+        self.lengths = array('l')
+        self.postings = {}
+        self.total_length = 0
+
+    def add(self, question_id, body):
+        position = len(self.ids)
+        counts = {}
+        for term in terms(body):
+            counts[term] = counts.get(term, 0) + 1
+
+        for term, tf in counts.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = (array('l'), array('l'))
+            posting[0].append(position)
+            posting[1].append(tf)
+
+        length = sum(counts.values())
+        self.ids.append(question_id)
+        self.lengths.append(length)
+        self.total_length += length
+
+    def rank(self, query_terms):
+        """[(question_id, score)] of documents matching any term, best first."""
+        n = len(self.ids)
+        if not n:
+            return []
+
+        average = self.total_length / n or 1
+        lengths = self.lengths
+        scores = {}
+        for term in set(query_terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            positions, tfs = posting
+            idf = math.log(1 + (n - len(positions) + 0.5) / (len(positions) + 0.5))
+            for position, tf in zip(positions, tfs):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[position] / average)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ids = self.ids
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], ids[item[0]]))
+        return [(ids[position], score) for position, score in ranked]
+
+
+class QuestionSearch:
+    """
+    Ranked full-text search over question text and MCQ options.
+
+    Every question has a search document in tbl_question_search, written
+    by an after_flush hook for ORM changes and by index_new for Core bulk
+    inserts. Matching uses the database's own full-text index where there
+    is one: a FULLTEXT index on MySQL, an FTS5 table on SQLite. Other
+    databases (or SQLite without FTS5) fall back to process-local BM25
+    indexes per course, built lazily and dropped when the course's
+    documents change (the TTL bounds staleness across worker processes).
+    """
+
+    def __init__(self, app=None):
+        self.backend = 'auto'
+        self._resolved = None
+        self._indexes = LRUCache()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from ..models import QuestionSearchDocument
+
+        self.backend = app.config.get('QUESTION_SEARCH_BACKEND', 'auto')
+        self._resolved = None
+        self._indexes = LRUCache(
+            max_size=app.config.get('QUESTION_SEARCH_INDEX_MAX_COURSES', 64),
+            ttl=app.config.get('QUESTION_SEARCH_INDEX_TTL', 300)
+        )
+
+        if not event.contains(QuestionSearchDocument.__table__, 'after_create', create_sqlite_fts):
+            event.listen(QuestionSearchDocument.__table__, 'after_create', create_sqlite_fts)
+
+        if not event.contains(Session, 'after_flush', _sync_search_documents):
+            event.listen(Session, 'after_flush', _sync_search_documents)
+            event.listen(Session, 'after_commit', _invalidate_dirty_courses)
+            event.listen(Session, 'after_rollback', _discard_dirty_courses)
+
+    def resolve_backend(self):
+        """Backend in use: the configured one, or the best the database offers."""
+        from ..extensions import db
+
+        if self.backend in BACKENDS:
+            return self.backend
+        if self._resolved is None:
+            dialect = db.engine.dialect.name
+            if dialect == 'mysql':
+                self._resolved = 'fulltext'
+            elif dialect == 'sqlite' and inspect(db.engine).has_table(SQLITE_FTS_TABLE):
+                self._resolved = 'fts5'
+            else:
+                self._resolved = 'memory'
+        return self._resolved
+
+    # =====================================================
+    # SEARCH
+    # =====================================================
+    def search(self, course_id, text, filters=(), limit=20, offset=0):
+        """
+        ([(question_id, score)], has_more) for one page of the course's
+        questions matching any term of `text`, best match first. `filters`
+        are extra conditions on Question (e.g. from question_filters).
+        """
+        query_terms = terms(text)[:MAX_QUERY_TERMS]
+        if not query_terms:
+            return [], False
+
+        backend = self.resolve_backend()
+        if backend == 'memory':
+            return self._search_memory(course_id, query_terms, filters, limit, offset)
+
+        from ..extensions import db
+        from ..models import Question, QuestionSearchDocument as D
+
+        if backend == 'fulltext':
+            relevance = match(D.body, against=' '.join(query_terms)).in_natural_language_mode()
+            query = select(D.question_id, relevance.label('score')).where(D.course_id == course_id, relevance)
+            key = D.question_id
+        else:
+            # FTS5 ranks with bm25() (lower is better); the course_id column
+            # is matched as a term so only that course's documents are scored
+            fts = table(SQLITE_FTS_TABLE, column('rowid'))
+            fts_ref = literal_column(SQLITE_FTS_TABLE)
+            expression = f'course_id : "{int(course_id)}" AND body : (' + \
+                ' OR '.join(f'"{term}"' for term in query_terms) + ')'
+            relevance = -func.bm25(fts_ref, 1.0, 0.0)
+            query = select(fts.c.rowid.label('question_id'), relevance.label('score')).select_from(fts) \
+                .where(fts_ref.op('MATCH')(expression))
+            key = fts.c.rowid
+
+        rows = db.session.execute(
+            query.join(Question, Question.id == key)
+            .where(*filters)
+            .order_by(literal_column('score').desc(), key)
+            .limit(limit + 1).offset(offset)
+        ).all()
+        return [(row.question_id, float(row.score)) for row in rows[:limit]], len(rows) > limit
+
+    def _search_memory(self, course_id, query_terms, filters, limit, offset, chunk_size=500):
+        from ..extensions import db
+        from ..models import Question
+
+        ranked = self._index(course_id).rank(query_terms)
+
+        # Walk the ranking in chunks, keeping the ids that pass the filters
+        wanted = offset + limit + 1
+        page = []
+        for start in range(0, len(ranked), chunk_size):
+            chunk = ranked[start:start + chunk_size]
+            allowed = set(db.session.execute(
+                select(Question.id).where(Question.id.in_([i for i, _ in chunk]), *filters)
+            ).scalars())
+            page.extend(item for item in chunk if item[0] in allowed)
+            if len(page) >= wanted:
+                break
+
+        return page[offset:offset + limit], len(page) > offset + limit
+
+    def _index(self, course_id):
+        from ..extensions import db
+        from ..models import QuestionSearchDocument as D
+
+        index = self._indexes.get(course_id)
+        if index is None:
+            index = CourseTextIndex(course_id)
+            for question_id, body in db.session.execute(
+                select(D.question_id, D.body).where(D.course_id == course_id).order_by(D.question_id)
+            ):
+                index.add(question_id, body)
+            self._indexes.set(course_id, index)
+        return index
+
+    def invalidate(self, course_id=None):
+        if course_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(course_id)
+
+    # =====================================================
+    # MAINTENANCE
+    # =====================================================
+    def index_new(self, course_id, after_id=0, batch_size=1000):
+        """
+        Write search documents for the course's questions with id >
+        `after_id` that have none yet (e.g. just written by a Core INSERT).
+        Runs in the caller's transaction; returns the number written.
+        """
+        from ..extensions import db
+        from ..models import Question, QuestionSearchDocument as D
+
+        indexed = 0
+        while True:
+            rows = db.session.execute(
+                select(Question.id, Question.text, Question.options).where(
+                    Question.course_id == course_id,
+                    Question.id > after_id,
+                    ~exists().where(D.question_id == Question.id)
+                ).order_by(Question.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return indexed
+
+            db.session.execute(insert(D), [
+                document_row(question_id, course_id, text, options)
+                for question_id, text, options in rows
+            ])
+            indexed += len(rows)
+            after_id = rows[-1].id
+
+    def rebuild(self, course_id=None, batch_size=1000):
+        """Drop and rewrite the search documents of one course or every course."""
+        from ..extensions import db
+        from ..models import Course, QuestionSearchDocument as D
+
+        course_ids = [course_id] if course_id is not None else \
+            db.session.execute(select(Course.id)).scalars().all()
+
+        indexed = 0
+        for cid in course_ids:
+            db.session.execute(delete(D).where(D.course_id == cid))
+            indexed += self.index_new(cid, batch_size=batch_size)
+            self.invalidate(cid)
+        return indexed
+
+
+# =====================================================
+# SESSION EVENTS
+# =====================================================
+def _sync_search_documents(session, flush_context):
+    from ..models import Question, QuestionSearchDocument as D
+
+    stale, rows = set(), []
+    dirty = session.info.setdefault('question_search_dirty', set())
+
+    for obj in session.new:
+        if isinstance(obj, Question):
+            rows.append(document_row(obj.id, obj.course_id, obj.text, obj.options))
+            dirty.add(obj.course_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            stale.add(obj.id)
+            dirty.add(obj.course_id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Question):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[f].history.has_changes() for f in ('text', 'options', 'course_id')):
+            stale.add(obj.id)
+            rows.append(document_row(obj.id, obj.course_id, obj.text, obj.options))
+            dirty.add(obj.course_id)
+            dirty.update(state.attrs.course_id.history.deleted)
+
+    if stale:
+        session.connection().execute(delete(D).where(D.question_id.in_(stale)))
+    if rows:
+        session.connection().execute(insert(D), rows)
+
+
+def _invalidate_dirty_courses(session):
+    from ..extensions import question_search
+
+    for course_id in session.info.pop('question_search_dirty', ()):
+        question_search.invalidate(course_id)
+
+
+def _discard_dirty_courses(session):
+    session.info.pop('question_search_dirty', None)
@@ -0,0 +1,97 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from ..extensions import db
+from ..models import GeneratedPaper, QuestionUsage
+
+
+def load_exposure(course_id, exclude_last):
+    """
+    Read per-question use counts for a course from tbl_question_usage.
+    Returns ({question_id: use_count}, {question ids used in the last
+    `exclude_last` papers of the course}).
+    """
+    recent_from = None
+    if exclude_last:
+        # Paper ids grow monotonically, so "used in the last K papers" is
+        # last_paper_id >= id of the K-th most recent paper
+        recent_from = db.session.execute(
+            select(GeneratedPaper.id)
+            .where(GeneratedPaper.course_id == course_id)
+            .order_by(GeneratedPaper.id.desc())
+            .offset(exclude_last - 1)
+            .limit(1)
+        ).scalar()
+
+        if recent_from is None:
+            recent_from = 0  # Fewer than K papers so far: all of them count
+
+    use_counts = {}
+    recent = set()
+    rows = db.session.execute(
+        select(
+            QuestionUsage.question_id,
+            QuestionUsage.use_count,
+            QuestionUsage.last_paper_id
+        ).where(QuestionUsage.course_id == course_id)
+    )
+    for question_id, use_count, last_paper_id in rows:
+        use_counts[question_id] = use_count
+        if recent_from is not None and last_paper_id is not None and last_paper_id >= recent_from:
+            recent.add(question_id)
+
+    return use_counts, recent
+
+
+def record_usage(course_id, paper_selections):
+    """
+    Bump use counts for the questions of freshly added papers.
+    `paper_selections` is [(paper_id, {section: [question ids]}), ...].
+    Runs as one upsert inside the caller's transaction.
+    """
+    now = datetime.utcnow()
+    usage = {}
+    for paper_id, selection in paper_selections:
+        for ids in selection.values():
+            for qid in ids:
+                count, last_paper_id = usage.get(qid, (0, 0))
+                usage[qid] = (count + 1, max(last_paper_id, paper_id))
+
+    if not usage:
+        return
+
+    rows = [
+        {
+            'question_id': qid,
+            'course_id': course_id,
+            'use_count': count,
+            'last_used_at': now,
+            'last_paper_id': last_paper_id
+        }
+        for qid, (count, last_paper_id) in usage.items()
+    ]
+
+    table = QuestionUsage.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == 'mysql':
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            use_count=table.c.use_count + stmt.inserted.use_count,
+            last_used_at=stmt.inserted.last_used_at,
+            last_paper_id=stmt.inserted.last_paper_id
+        )
+    else:
+        stmt = (sqlite_insert if dialect == 'sqlite' else postgresql_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.question_id],
+            set_={
+                'use_count': table.c.use_count + stmt.excluded.use_count,
+                'last_used_at': stmt.excluded.last_used_at,
+                'last_paper_id': stmt.excluded.last_paper_id
+            }
+        )
+
+    db.session.execute(stmt, rows)
@@ -0,0 +1,273 @@
+import hashlib
+import random
+import re
+import struct
+from sqlalchemy import delete, event, exists, func, insert, inspect, select, union_all
+from sqlalchemy.orm import Session
+
+
+# MinHash signature of NUM_PERM values split into BANDS bands of ROWS;
+# two texts share a band bucket with high probability once their shingle
+# Jaccard similarity passes ~(1 / BANDS) ** (1 / ROWS) ≈ 0.57 (pairs at
+# 0.7 collide ~95% of the time, pairs at 0.4 ~15%)
+SHINGLE_SIZE = 5
+NUM_PERM = 80
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Most candidates verified per lookup (those sharing the most bands first)
+MAX_CANDIDATES = 50
+
+# Fixed seed: stored buckets must stay comparable across processes and restarts
+_rng = random.Random(20240601)
+_masks = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+
+
+def shingles(text):
+    """Character SHINGLE_SIZE-grams of the text, case and punctuation folded."""
+    text = ' '.join(re.sub(r'[^0-9a-z]+', ' ', (text or '').lower()).split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), 'little')
+
+
+def band_buckets(shingle_set):
+    """[(band, bucket)] LSH keys of a shingle set (empty for empty text)."""
+    if not shingle_set:
+        return []
+
+    hashes = [_hash64(s.encode('utf-8')) for s in shingle_set]
+    # Random XOR masks stand in for NUM_PERM hash permutations
+    signature = [min(h ^ mask for h in hashes) for mask in _masks]
+
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        # Signed 64-bit so the bucket fits a BIGINT column
+        bucket = _hash64(struct.pack(f'<{ROWS}Q', *rows)) - (1 << 63)
+        buckets.append((band, bucket))
+    return buckets
+
+
+def index_rows(question_id, course_id, text):
+    return [
+        {'course_id': course_id, 'band': band, 'bucket': bucket, 'question_id': question_id}
+        for band, bucket in band_buckets(shingles(text))
+    ]
+
+
+class SimilarityIndex:
+    """
+    MinHash/LSH index of question texts per course, stored as band
+    buckets in tbl_question_similarity. ORM inserts and text edits are
+    indexed by an after_flush hook in the same transaction; Core bulk
+    inserts call index_new. Finding near duplicates of a text is one
+    indexed lookup of its BANDS buckets plus an exact check of the few
+    candidates, never a scan of the course's questions.
+    """
+
+    def __init__(self, app=None):
+        self.threshold = 0.7
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.threshold = app.config.get('SIMILARITY_THRESHOLD', 0.7)
+
+        if not event.contains(Session, 'after_flush', _index_question_changes):
+            event.listen(Session, 'after_flush', _index_question_changes)
+
+    def similar(self, course_id, text, threshold=None, limit=5, exclude_id=None):
+        """
+        [{id, similarity, topic_id, active, text}] of the course's
+        questions whose text is at least `threshold` similar (Jaccard of
+        shingles) to `text`, most similar first.
+        """
+        from ..extensions import db
+        from ..models import Question, QuestionSimilarity as S
+
+        threshold = self.threshold if threshold is None else threshold
+        query_shingles = shingles(text)
+        buckets = band_buckets(query_shingles)
+        if not buckets:
+            return []
+
+        # One primary-key seek per band (an OR of the pairs would only use
+        # the course_id prefix and read every bucket of the course)
+        hits = union_all(*(
+            select(S.question_id).where(S.course_id == course_id, S.band == band, S.bucket == bucket)
+            for band, bucket in buckets
+        )).subquery()
+        candidate_ids = db.session.execute(
+            select(hits.c.question_id).group_by(hits.c.question_id)
+            .order_by(func.count().desc()).limit(MAX_CANDIDATES)
+        ).scalars().all()
+        candidate_ids = [i for i in candidate_ids if i != exclude_id]
+        if not candidate_ids:
+            return []
+
+        matches = []
+        for row in db.session.execute(
+            select(Question.id, Question.topic_id, Question.active, Question.text)
+            .where(Question.id.in_(candidate_ids))
+        ):
+            similarity = jaccard(query_shingles, shingles(row.text))
+            if similarity >= threshold:
+                matches.append({
+                    'id': row.id,
+                    'similarity': round(similarity, 3),
+                    'topic_id': row.topic_id,
+                    'active': bool(row.active),
+                    'text': row.text,
+                })
+
+        matches.sort(key=lambda m: (-m['similarity'], m['id']))
+        return matches[:limit]
+
+    def index_new(self, course_id, after_id=0, batch_size=1000):
+        """
+        Index the course's questions with id > `after_id` that have no
+        buckets yet (e.g. just written by a Core INSERT). Runs in the
+        caller's transaction; returns the number indexed.
+        """
+        from ..extensions import db
+        from ..models import Question, QuestionSimilarity as S
+
+        indexed = 0
+        while True:
+            # Keyset batches: the INSERTs below cannot share the connection
+            # with an open streaming cursor on MySQL
+            rows = db.session.execute(
+                select(Question.id, Question.text).where(
+                    Question.course_id == course_id,
+                    Question.id > after_id,
+                    ~exists().where(S.question_id == Question.id)
+                ).order_by(Question.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return indexed
+
+            entries = [
+                entry for question_id, text in rows
+                for entry in index_rows(question_id, course_id, text)
+            ]
+            if entries:
+                db.session.execute(insert(S), entries)
+            indexed += len(rows)
+            after_id = rows[-1].id
+
+    def rebuild(self, course_id=None, batch_size=1000):
+        """Drop and recompute the buckets of one course or every course."""
+        from ..extensions import db
+        from ..models import Course, QuestionSimilarity as S
+
+        course_ids = [course_id] if course_id is not None else \
+            db.session.execute(select(Course.id)).scalars().all()
+
+        indexed = 0
+        for cid in course_ids:
+            db.session.execute(delete(S).where(S.course_id == cid))
+            indexed += self.index_new(cid, batch_size=batch_size)
+        return indexed
+
+    def clusters(self, course_id, threshold=None):
+        """
+        Groups of near-duplicate question ids in a course: pairs sharing
+        a band bucket are verified exactly, then joined transitively.
+        """
+        from ..extensions import db
+        from ..models import Question, QuestionSimilarity as S
+
+        threshold = self.threshold if threshold is None else threshold
+
+        pairs = set()
+        bucket_members = []
+        current = None
+        for band, bucket, question_id in db.session.execute(
+            select(S.band, S.bucket, S.question_id)
+            .where(S.course_id == course_id)
+            .order_by(S.band, S.bucket, S.question_id)
+        ):
+            if (band, bucket) != current:
+                bucket_members = []
+                current = (band, bucket)
+            for other in bucket_members:
+                pairs.add((other, question_id))
+            bucket_members.append(question_id)
+
+        if not pairs:
+            return []
+
+        ids = sorted({i for pair in pairs for i in pair})
+        texts = {}
+        for start in range(0, len(ids), 1000):
+            texts.update(db.session.execute(
+                select(Question.id, Question.text).where(Question.id.in_(ids[start:start + 1000]))
+            ).all())
+        shingle_sets = {i: shingles(t) for i, t in texts.items()}
+
+        parent = {}
+
+        def find(i):
+            parent.setdefault(i, i)
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for a, b in pairs:
+            if a not in shingle_sets or b not in shingle_sets:
+                continue
+            sa, sb = shingle_sets[a], shingle_sets[b]
+            # Jaccard is at most the ratio of the set sizes
+            if min(len(sa), len(sb)) < threshold * max(len(sa), len(sb)):
+                continue
+            root_a, root_b = find(a), find(b)
+            if root_a != root_b and jaccard(sa, sb) >= threshold:
+                parent[root_a] = root_b
+
+        groups = {}
+        for i in parent:
+            groups.setdefault(find(i), []).append(i)
+        return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+
+# =====================================================
+# SESSION EVENTS
+# =====================================================
+def _index_question_changes(session, flush_context):
+    from ..models import Question, QuestionSimilarity as S
+
+    stale, rows = set(), []
+
+    for obj in session.new:
+        if isinstance(obj, Question):
+            rows.extend(index_rows(obj.id, obj.course_id, obj.text))
+
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            stale.add(obj.id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Question):
+            continue
+        state = inspect(obj)
+        if state.attrs.text.history.has_changes() or state.attrs.course_id.history.has_changes():
+            stale.add(obj.id)
+            rows.extend(index_rows(obj.id, obj.course_id, obj.text))
+
+    if stale:
+        session.connection().execute(delete(S).where(S.question_id.in_(stale)))
+    if rows:
+        session.connection().execute(insert(S), rows)
@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+import threading
+from flask_jwt_extended import create_access_token, create_refresh_token
+
+
+class RevocationList:
+    """
+    In-memory set of revoked token ids (jti), each kept only until the
+    token would have expired anyway. Checked on every token request
+    without touching the database; local to the worker process.
+    """
+
+    def __init__(self):
+        self._revoked = {}  # jti → expiry timestamp
+        self._lock = threading.Lock()
+
+    def revoke(self, jti, expires_at):
+        with self._lock:
+            self._prune()
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti):
+        return jti in self._revoked
+
+    def clear(self):
+        with self._lock:
+            self._revoked.clear()
+
+    def _prune(self):
+        now = datetime.now(timezone.utc).timestamp()
+        for jti in [j for j, exp in self._revoked.items() if exp < now]:
+            del self._revoked[jti]
+
+    def __len__(self):
+        return len(self._revoked)
+
+
+def principal_claims(principal):
+    """Signed claims that let API requests be authorized without a lookup."""
+    return {
+        'role': principal.role,
+        'department_id': principal.department_id,
+        'is_hod': principal.is_hod,
+    }
+
+
+def issue_tokens(principal):
+    identity = str(principal.id)
+    claims = principal_claims(principal)
+    return {
+        'access_token': create_access_token(identity=identity, additional_claims=claims),
+        'refresh_token': create_refresh_token(identity=identity, additional_claims=claims),
+    }
+
+
+def refresh_access_token(identity, claims):
+    """
+    New access token for the account behind a refresh token, with claims
+    minted from its current role, department and HOD status. Returns None
+    if the account no longer exists or has been deactivated.
+    """
+    from sqlalchemy.orm import joinedload
+    from ..extensions import db
+    from ..models import Faculty, SuperAdmin
+    from .auth import Principal
+
+    role = claims.get('role')
+    if role == 'super_admin':
+        user = db.session.get(SuperAdmin, int(identity))
+    elif role == 'faculty':
+        user = Faculty.query.options(
+            joinedload(Faculty.department)
+        ).filter_by(id=int(identity)).first()
+        if user is not None and not user.active:
+            user = None
+    else:
+        user = None
+
+    if user is None:
+        return None
+
+    return create_access_token(
+        identity=identity,
+        additional_claims=principal_claims(Principal(role, user))
+    )
+
+
+def init_jwt(jwt, revoked_tokens):
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return revoked_tokens.is_revoked(jwt_payload['jti'])
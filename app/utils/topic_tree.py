@@ -0,0 +1,241 @@
+from sqlalchemy import case, delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+
+def closure_rows(parents):
+    """
+    Every (ancestor_id, descendant_id, depth) path of a forest given as
+    {topic_id: parent_topic_id}, including each topic's path to itself.
+    Parent links that loop are cut where the loop closes.
+    """
+    rows = []
+    for topic_id in parents:
+        seen = {topic_id}
+        rows.append({'ancestor_id': topic_id, 'descendant_id': topic_id, 'depth': 0})
+        ancestor, depth = parents.get(topic_id), 1
+        while ancestor is not None and ancestor in parents and ancestor not in seen:
+            rows.append({'ancestor_id': ancestor, 'descendant_id': topic_id, 'depth': depth})
+            seen.add(ancestor)
+            ancestor, depth = parents.get(ancestor), depth + 1
+    return rows
+
+
+class TopicTree:
+    """
+    Topic hierarchy as a closure table (tbl_topic_closure): one row per
+    ancestor/descendant pair, self pairs included, so a subtree is a
+    single indexed lookup on ancestor_id.
+
+    An after_flush hook keeps the table in step with Topic inserts,
+    re-parenting and deletes; `flask questions topic-tree` rebuilds it
+    from parent_topic_id.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not event.contains(Session, 'after_flush', _sync_topic_paths):
+            event.listen(Session, 'after_flush', _sync_topic_paths)
+
+    # =====================================================
+    # READS
+    # =====================================================
+    def subtree_select(self, topic_ids):
+        """SELECT of the ids of `topic_ids` and all their descendants."""
+        from ..models import TopicClosure as C
+
+        if isinstance(topic_ids, int):
+            return select(C.descendant_id).where(C.ancestor_id == topic_ids)
+        return select(C.descendant_id).where(C.ancestor_id.in_(topic_ids)).distinct()
+
+    def subtree_ids(self, topic_ids):
+        """Ids of `topic_ids` and all their descendants, sorted."""
+        from ..extensions import db
+
+        if not topic_ids:
+            return []
+        return sorted(db.session.execute(self.subtree_select(topic_ids)).scalars())
+
+    def contains(self, ancestor_id, topic_id):
+        """Whether `topic_id` is `ancestor_id` or lies under it."""
+        from ..extensions import db
+        from ..models import TopicClosure as C
+
+        return db.session.execute(
+            select(C.depth).where(C.ancestor_id == ancestor_id, C.descendant_id == topic_id)
+        ).first() is not None
+
+    def course_tree(self, course_id, active=True):
+        """
+        The course's topics in depth-first order (siblings by code) as
+        dicts with their CO, `depth`, and the number of questions filed
+        directly under each topic and under its whole subtree. Counts
+        come from the pool statistics, in one aggregate query.
+        """
+        from ..extensions import db
+        from ..models import CourseOutcome, QuestionPoolStat as S, Topic, TopicClosure as C
+
+        topics = [dict(row) for row in db.session.execute(
+            select(
+                Topic.id, Topic.code, Topic.title, Topic.parent_topic_id, Topic.co_id,
+                CourseOutcome.code.label('co_code'),
+                CourseOutcome.description.label('co_description'),
+                CourseOutcome.bloom_level
+            )
+            .outerjoin(CourseOutcome, CourseOutcome.id == Topic.co_id)
+            .where(Topic.course_id == course_id)
+            .order_by(Topic.code, Topic.id)
+        ).mappings()]
+
+        counts = {
+            ancestor_id: (int(own or 0), int(total or 0))
+            for ancestor_id, own, total in db.session.execute(
+                select(
+                    C.ancestor_id,
+                    func.sum(case((C.depth == 0, S.question_count), else_=0)),
+                    func.sum(S.question_count)
+                )
+                .join(S, S.topic_id == C.descendant_id)
+                .where(S.course_id == course_id, S.active == active)
+                .group_by(C.ancestor_id)
+            )
+        }
+
+        by_id = {t['id']: t for t in topics}
+        children = {}
+        for t in topics:
+            parent = t['parent_topic_id'] if t['parent_topic_id'] in by_id else None
+            children.setdefault(parent, []).append(t)
+
+        ordered = []
+        stack = [(t, 0) for t in reversed(children.get(None, []))]
+        while stack:
+            t, depth = stack.pop()
+            t['depth'] = depth
+            t['question_count'], t['subtree_question_count'] = counts.get(t['id'], (0, 0))
+            ordered.append(t)
+            stack.extend((c, depth + 1) for c in reversed(children.get(t['id'], [])))
+        return ordered
+
+    # =====================================================
+    # RECONCILIATION
+    # =====================================================
+    def rebuild(self, course_id=None):
+        """
+        Rewrite the paths of one course's topics (or all topics) from
+        parent_topic_id. Runs in the caller's transaction; returns the
+        number of paths written.
+        """
+        from ..extensions import db
+        from ..models import Topic, TopicClosure as C
+
+        query = select(Topic.id, Topic.parent_topic_id)
+        if course_id is not None:
+            query = query.where(Topic.course_id == course_id)
+        parents = dict(db.session.execute(query).all())
+        if not parents:
+            return 0
+
+        clear = delete(C)
+        if course_id is not None:
+            clear = clear.where(C.descendant_id.in_(list(parents)))
+        db.session.execute(clear)
+
+        rows = closure_rows(parents)
+        db.session.execute(insert(C), rows)
+        return len(rows)
+
+
+# =====================================================
+# SESSION EVENTS
+# =====================================================
+def _sync_topic_paths(session, flush_context):
+    from ..models import Topic
+
+    new = [obj for obj in session.new if isinstance(obj, Topic)]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Topic)]
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, Topic) and _parent_changed(obj)
+    ]
+    if not (new or deleted or moved):
+        return
+
+    connection = session.connection()
+    if deleted:
+        _delete_paths(connection, deleted)
+
+    # Parents before children when both are added in one flush
+    pending = {obj.id: obj.parent_topic_id for obj in new}
+    for obj in sorted(new, key=lambda t: _pending_depth(t.id, pending)):
+        _insert_paths(connection, obj.id, obj.parent_topic_id)
+
+    for obj in moved:
+        _move_subtree(connection, obj.id, obj.parent_topic_id)
+
+
+def _parent_changed(topic):
+    state = inspect(topic)
+    return state.attrs.parent_topic_id.history.has_changes() or \
+        state.attrs.parent.history.has_changes()
+
+
+def _pending_depth(topic_id, pending):
+    depth, parent = 0, pending[topic_id]
+    while parent in pending and depth < len(pending):
+        depth, parent = depth + 1, pending[parent]
+    return depth
+
+
+def _ancestor_paths(connection, topic_id):
+    from ..models import TopicClosure as C
+
+    if topic_id is None:
+        return []
+    return connection.execute(
+        select(C.ancestor_id, C.depth).where(C.descendant_id == topic_id)
+    ).all()
+
+
+def _insert_paths(connection, topic_id, parent_id):
+    from ..models import TopicClosure as C
+
+    rows = [{'ancestor_id': topic_id, 'descendant_id': topic_id, 'depth': 0}]
+    rows.extend(
+        {'ancestor_id': ancestor_id, 'descendant_id': topic_id, 'depth': depth + 1}
+        for ancestor_id, depth in _ancestor_paths(connection, parent_id)
+    )
+    connection.execute(insert(C), rows)
+
+
+def _move_subtree(connection, topic_id, parent_id):
+    """Re-hang the subtree under `topic_id` below `parent_id` (None = root)."""
+    from ..models import TopicClosure as C
+
+    subtree = connection.execute(
+        select(C.descendant_id, C.depth).where(C.ancestor_id == topic_id)
+    ).all()
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+    # Paths from outside the subtree into it go; paths inside it stay
+    connection.execute(delete(C).where(
+        C.descendant_id.in_(subtree_ids), C.ancestor_id.not_in(subtree_ids)
+    ))
+
+    ancestors = _ancestor_paths(connection, parent_id)
+    if ancestors:
+        connection.execute(insert(C), [
+            {'ancestor_id': ancestor_id, 'descendant_id': descendant_id, 'depth': up + down + 1}
+            for ancestor_id, up in ancestors
+            for descendant_id, down in subtree
+        ])
+
+
+def _delete_paths(connection, topic_ids):
+    from ..models import TopicClosure as C
+
+    connection.execute(delete(C).where(
+        C.descendant_id.in_(topic_ids) | C.ancestor_id.in_(topic_ids)
+    ))
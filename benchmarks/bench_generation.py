@@ -0,0 +1,397 @@
+"""
+Synthetic large-pool benchmark for the paper generation path.
+
+Seeds a database with a configurable number of departments, courses and
+questions, then drives the real Flask routes through the test client and
+reports p50/p95/p99 latency, query count and peak Python memory per
+endpoint. Results are written as JSON so runs can be compared between
+commits.
+
+    python benchmarks/bench_generation.py --departments 50 --courses 2000 \\
+        --questions 1000000 --database-url sqlite:///bench.db
+
+Seeding is skipped when the database already holds questions, so the
+same data set can be reused across runs (pass --reseed to rebuild it).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func, insert, select
+
+from app import create_app
+from app.config import Config
+from app.extensions import db, pool_stats, topic_tree
+from app.models import (
+    Course, CourseOutcome, Department, Faculty, GeneratedPaper, Programme,
+    ProgrammeCourseOffering, Question, SuperAdmin, Template, Topic
+)
+
+
+BATCH_SIZE = 10000
+PAPER_URL = re.compile(r'/faculty/generation/paper/\d+$')
+TOPICS_PER_COURSE = 6
+BLOOM_LEVELS = ['Remember', 'Understand', 'Apply', 'Analyse']
+
+# (question_type, mark_value) mix of the seeded pool and the template using it
+QUESTION_KINDS = [('mcq', 1), ('descriptive', 5), ('descriptive', 10)]
+TEMPLATE_SECTIONS = [
+    {"section": "A", "question_type": "mcq", "mark_per_question": 1, "number_of_questions": 10},
+    {"section": "B", "question_type": "descriptive", "mark_per_question": 5, "number_of_questions": 4},
+    {"section": "C", "question_type": "descriptive", "mark_per_question": 10, "number_of_questions": 2},
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL', 'sqlite:///bench.db'))
+    parser.add_argument('--departments', type=int, default=5)
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--questions', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=50,
+                        help="requests per endpoint")
+    parser.add_argument('--sample-courses', type=int, default=10,
+                        help="courses the requests are spread over")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--reseed', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+
+# =====================================================
+# SEEDING
+# =====================================================
+def _insert(model, rows):
+    for i in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(insert(model), rows[i:i + BATCH_SIZE])
+
+
+def seed(args, rng):
+    if args.reseed:
+        db.drop_all()
+    db.create_all()
+
+    admin = SuperAdmin(email='bench-admin@example.com')
+    admin.set_password('bench')
+    db.session.add(admin)
+
+    _insert(Department, [{'name': f'Department {d}'} for d in range(args.departments)])
+    department_ids = db.session.execute(select(Department.id).order_by(Department.id)).scalars().all()
+
+    _insert(Faculty, [
+        {
+            'name': f'Faculty {d}',
+            'email': f'faculty{d}@example.com',
+            'password_hash': 'x',
+            'role': 'faculty',
+            'department_id': department_id,
+        }
+        for d, department_id in enumerate(department_ids)
+    ])
+    faculty_ids = db.session.execute(select(Faculty.id).order_by(Faculty.id)).scalars().all()
+
+    _insert(Programme, [
+        {'name': f'Programme {d}', 'department_id': department_id}
+        for d, department_id in enumerate(department_ids)
+    ])
+    programme_ids = db.session.execute(select(Programme.id).order_by(Programme.id)).scalars().all()
+
+    _insert(Course, [
+        {
+            'code': f'BENCH{c:05d}',
+            'title': f'Course {c}',
+            'home_department_id': department_ids[c % len(department_ids)],
+        }
+        for c in range(args.courses)
+    ])
+    course_ids = db.session.execute(select(Course.id).order_by(Course.id)).scalars().all()
+
+    _insert(ProgrammeCourseOffering, [
+        {
+            'programme_id': programme_ids[c % len(programme_ids)],
+            'course_id': course_id,
+            'semester_no': 1,
+            'faculty_id': faculty_ids[c % len(faculty_ids)],
+        }
+        for c, course_id in enumerate(course_ids)
+    ])
+
+    _insert(CourseOutcome, [
+        {
+            'code': f'CO{i + 1}',
+            'description': f'Outcome {i + 1}',
+            'bloom_level': level,
+            'learning_domains': ['Cognitive'],
+            'course_id': course_id,
+        }
+        for course_id in course_ids
+        for i, level in enumerate(BLOOM_LEVELS)
+    ])
+    cos = {}
+    for co_id, course_id, bloom_level in db.session.execute(
+        select(CourseOutcome.id, CourseOutcome.course_id, CourseOutcome.bloom_level)
+    ):
+        cos.setdefault(course_id, []).append((co_id, bloom_level))
+
+    _insert(Topic, [
+        {
+            'code': f'{t + 1}.1',
+            'title': f'Topic {t + 1}',
+            'course_id': course_id,
+            'co_id': cos[course_id][t % len(cos[course_id])][0],
+        }
+        for course_id in course_ids
+        for t in range(TOPICS_PER_COURSE)
+    ])
+    topics = {}
+    for topic_id, course_id, co_id in db.session.execute(
+        select(Topic.id, Topic.course_id, Topic.co_id)
+    ):
+        topics.setdefault(course_id, []).append((topic_id, co_id))
+
+    _insert(Template, [
+        {
+            'course_id': course_id,
+            'duration_minutes': 180,
+            'total_marks': sum(s['mark_per_question'] * s['number_of_questions'] for s in TEMPLATE_SECTIONS),
+            'categories': TEMPLATE_SECTIONS,
+        }
+        for course_id in course_ids
+    ])
+    db.session.commit()
+
+    # Questions are generated and flushed batch by batch to keep memory flat
+    co_bloom = {co_id: level for pairs in cos.values() for co_id, level in pairs}
+    rows = []
+    for n in range(args.questions):
+        course_id = course_ids[n % len(course_ids)]
+        topic_id, co_id = rng.choice(topics[course_id])
+        question_type, mark_value = rng.choice(QUESTION_KINDS)
+        rows.append({
+            'course_id': course_id,
+            'topic_id': topic_id,
+            'text': f'Synthetic question {n} on topic {topic_id}',
+            'question_type': question_type,
+            'mark_value': mark_value,
+            'difficulty': rng.randint(1, 5),
+            'bloom_level': co_bloom[co_id],
+            'options': ['A', 'B', 'C', 'D'] if question_type == 'mcq' else None,
+            'active': True,
+        })
+        if len(rows) == BATCH_SIZE:
+            _insert(Question, rows)
+            db.session.commit()
+            rows = []
+
+    if rows:
+        _insert(Question, rows)
+
+    # Core INSERTs skip the pool statistics and topic closure hooks
+    pool_stats.rebuild()
+    topic_tree.rebuild()
+    db.session.commit()
+
+
+# =====================================================
+# MEASUREMENT
+# =====================================================
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(samples, pct):
+    if not samples:
+        raise ValueError("percentile of an empty sample")
+    ordered = sorted(samples)
+    index = max(0, -(-len(ordered) * pct // 100) - 1)
+    return ordered[int(index)]
+
+
+def measure(name, calls, counter, check=None):
+    """
+    Run every call once for latency and query count, then once more under
+    tracemalloc for peak memory (kept separate so tracing does not skew
+    the timings). `check(response)` returns an error message for a
+    response that only looks successful (e.g. a redirect back to a form).
+    """
+    if not calls:
+        raise SystemExit(f"{name}: nothing to measure")
+
+    latencies, queries = [], []
+    for call in calls:
+        counter.count = 0
+        started = time.perf_counter()
+        response = call()
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            raise SystemExit(f"{name} returned {response.status_code}")
+        error = check(response) if check else None
+        if error:
+            raise SystemExit(f"{name}: {error}")
+
+    peak = 0
+    tracemalloc.start()
+    for call in calls:
+        tracemalloc.reset_peak()
+        call()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    result = {
+        'requests': len(calls),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'queries_mean': round(sum(queries) / len(queries), 2),
+        'queries_max': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+    print(f"{name:<20} p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+          f"p99 {result['p99_ms']:>9.2f} ms  queries {result['queries_mean']:>6}  "
+          f"peak {result['peak_memory_kb']:>9.1f} KB")
+    return result
+
+
+def login(client, user_id, role):
+    with client.session_transaction() as s:
+        s['user_id'] = user_id
+        s['role'] = role
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+        TESTING = True
+
+    app = create_app(BenchConfig)
+    rng = random.Random(args.seed)
+
+    with app.app_context():
+        seeded = db.inspect(db.engine).has_table(Question.__tablename__) and \
+            db.session.execute(select(func.count(Question.id))).scalar()
+        if args.reseed or not seeded:
+            started = time.perf_counter()
+            seed(args, rng)
+            print(f"Seeded {args.questions} questions in {time.perf_counter() - started:.1f} s")
+
+        courses = db.session.execute(
+            select(Course.id, ProgrammeCourseOffering.faculty_id)
+            .join(ProgrammeCourseOffering, ProgrammeCourseOffering.course_id == Course.id)
+            .order_by(Course.id)
+        ).all()
+        sample = rng.sample(courses, min(args.sample_courses, len(courses)))
+        topics = {}
+        for topic_id, course_id in db.session.execute(
+            select(Topic.id, Topic.course_id).where(Topic.course_id.in_([c for c, _ in sample]))
+        ):
+            topics.setdefault(course_id, []).append(topic_id)
+        admin_id = db.session.execute(select(SuperAdmin.id)).scalar()
+
+        counter = QueryCounter(db.engine)
+        totals = db.session.execute(
+            select(func.count(func.distinct(Department.id)), func.count(func.distinct(Course.id)))
+            .select_from(Department).outerjoin(Course, Course.home_department_id == Department.id)
+        ).one()
+        question_total = db.session.execute(select(func.count(Question.id))).scalar()
+
+    client = app.test_client()
+    picks = [sample[i % len(sample)] for i in range(args.iterations)]
+
+    def generate(course_id, faculty_id):
+        def call():
+            login(client, faculty_id, 'faculty')
+            return client.post('/faculty/generation/generate', data={
+                'course_id': course_id, 'topic_ids': topics[course_id]
+            })
+        return call
+
+    def generated(response):
+        # Failed generations redirect back to the form with a flash message
+        location = response.headers.get('Location', '')
+        if response.status_code != 302 or not PAPER_URL.search(location):
+            with client.session_transaction() as s:
+                messages = [m for _, m in s.get('_flashes', [])]
+            return f"no paper generated ({response.status_code} -> {location or '-'}): " + \
+                ('; '.join(messages) or 'no message')
+        return None
+
+    results = {}
+    results['generate_paper'] = measure(
+        'generate_paper', [generate(c, f) for c, f in picks], counter, check=generated
+    )
+
+    with app.app_context():
+        papers = db.session.execute(
+            select(GeneratedPaper.id, GeneratedPaper.generated_by)
+            .order_by(GeneratedPaper.id.desc()).limit(args.iterations)
+        ).all()
+
+    def view(paper_id, faculty_id):
+        def call():
+            login(client, faculty_id, 'faculty')
+            return client.get(f'/faculty/generation/paper/{paper_id}')
+        return call
+
+    results['view_paper'] = measure(
+        'view_paper', [view(p, f) for p, f in papers], counter
+    )
+
+    def manage(course_id):
+        topic_id = topics[course_id][0]
+
+        def call():
+            login(client, admin_id, 'super_admin')
+            return client.get(f'/superadmin/questions?course_id={course_id}&topic_id={topic_id}')
+        return call
+
+    results['manage_questions'] = measure(
+        'manage_questions', [manage(c) for c, _ in picks], counter
+    )
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+        'scale': {
+            'departments': totals[0],
+            'courses': totals[1],
+            'questions': question_total,
+        },
+        'iterations': args.iterations,
+        'endpoints': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,180 @@
+"""
+Login lookup benchmark at growing faculty counts.
+
+Grows the faculty table step by step (1k, 10k, 100k rows by default)
+and at each size times the identity lookup on its own plus the real
+POST /login route for a known account, an unknown email and a mixed-case
+email, reporting p50/p95/p99 latency and query count. The lookup should
+stay flat as the table grows; a rising curve means it is scanning.
+
+    python benchmarks/bench_login.py --sizes 1000,10000,100000 \\
+        --database-url sqlite:///bench_login.db
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, select
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Department, Faculty
+from app.utils.auth import find_identity, identity_query
+from app.utils.query_plans import explain
+from bench_generation import QueryCounter, git_commit, percentile
+
+
+BATCH_SIZE = 10000
+PASSWORD = 'bench-login'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL', 'sqlite:///bench_login.db'))
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help="comma separated faculty counts, ascending")
+    parser.add_argument('--iterations', type=int, default=200,
+                        help="lookups / requests per measurement")
+    parser.add_argument('--output', default='bench_login_results.json')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser.parse_args()
+
+
+# =====================================================
+# SEEDING
+# =====================================================
+def grow_faculty(target):
+    """Insert synthetic faculty until the table holds `target` rows."""
+    department_id = db.session.execute(select(Department.id)).scalar()
+    if department_id is None:
+        department = Department(name='Bench Department')
+        db.session.add(department)
+        db.session.flush()
+        department_id = department.id
+
+    # One account with a real (cheap) hash so successful logins can be timed
+    if not db.session.execute(select(Faculty.id).where(Faculty.email == 'login0@example.com')).scalar():
+        db.session.add(Faculty(
+            name='Login Bench',
+            email='login0@example.com',
+            password_hash=generate_password_hash(PASSWORD, method='pbkdf2:sha256:1000'),
+            role='faculty',
+            department_id=department_id,
+        ))
+        db.session.flush()
+
+    current = db.session.execute(select(func.count(Faculty.id))).scalar()
+    for start in range(current, target, BATCH_SIZE):
+        db.session.execute(insert(Faculty), [
+            {
+                'name': f'Faculty {n}',
+                'email': f'login{n}@example.com',
+                'password_hash': 'x',
+                'role': 'faculty',
+                'department_id': department_id,
+            }
+            for n in range(start, min(start + BATCH_SIZE, target))
+        ])
+    db.session.commit()
+
+
+# =====================================================
+# MEASUREMENT
+# =====================================================
+def timed(name, calls, counter, expected_status=None):
+    latencies, queries = [], []
+    for call in calls:
+        counter.count = 0
+        started = time.perf_counter()
+        result = call()
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        if expected_status is not None and result.status_code != expected_status:
+            raise RuntimeError(f"{name} returned {result.status_code}")
+
+    result = {
+        'samples': len(calls),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_mean': round(sum(queries) / len(queries), 2),
+    }
+    print(f"  {name:<18} p50 {result['p50_ms']:>8.3f} ms  p95 {result['p95_ms']:>8.3f} ms  "
+          f"p99 {result['p99_ms']:>8.3f} ms  queries {result['queries_mean']}")
+    return result
+
+
+def run(args):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = args.database_url
+        TESTING = True
+
+    app = create_app(BenchConfig)
+    rng = random.Random(args.seed)
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    client = app.test_client()
+
+    with app.app_context():
+        db.create_all()
+        counter = QueryCounter(db.engine)
+        plan = [detail for _, detail, _ in explain(identity_query('login0@example.com'))]
+    print("Identity lookup plan:\n    " + "\n    ".join(plan))
+
+    runs = []
+    for size in sizes:
+        with app.app_context():
+            started = time.perf_counter()
+            grow_faculty(size)
+            print(f"{size} faculty (seeded in {time.perf_counter() - started:.1f} s)")
+            emails = [f'login{rng.randrange(size)}@example.com' for _ in range(args.iterations)]
+
+            lookup = timed('find_identity', [
+                (lambda email=email: find_identity(email)) for email in emails
+            ], counter)
+
+        def post_login(email, password):
+            def call():
+                with client.session_transaction() as s:
+                    s.clear()
+                return client.post('/login', data={'email': email, 'password': password})
+            return call
+
+        results = {
+            'find_identity': lookup,
+            'login_success': timed('login success', [
+                post_login('login0@example.com', PASSWORD) for _ in range(args.iterations)
+            ], counter, expected_status=302),
+            'login_unknown': timed('login unknown', [
+                post_login(f'nobody{n}@example.com', PASSWORD) for n in range(args.iterations)
+            ], counter),
+            'login_mixed_case': timed('login mixed case', [
+                post_login('  Login0@Example.COM ', PASSWORD) for _ in range(args.iterations)
+            ], counter, expected_status=302),
+        }
+        runs.append({'faculty': size, 'results': results})
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'database': app.config['SQLALCHEMY_DATABASE_URI'].split(':', 1)[0],
+        'iterations': args.iterations,
+        'plan': plan,
+        'runs': runs,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    run(parse_args())
@@ -0,0 +1,48 @@
+"""Normalize account emails to trimmed lowercase
+
+Revision ID: 4b8f2c6e9a13
+Revises: d7a3e5f1b820
+Create Date: 2026-10-18 16:41:09.552180
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b8f2c6e9a13'
+down_revision = 'd7a3e5f1b820'
+branch_labels = None
+depends_on = None
+
+
+ACCOUNT_TABLES = ('tbl_superadmins', 'tbl_faculty')
+
+
+def upgrade():
+    # Logins now compare email = :email against the unique index, so
+    # stored emails must already be in the form normalize_email() produces
+    conn = op.get_bind()
+
+    for table in ACCOUNT_TABLES:
+        clashes = conn.execute(sa.text(
+            f"SELECT LOWER(TRIM(email)) AS normalized, COUNT(*) AS n FROM {table} "
+            f"GROUP BY LOWER(TRIM(email)) HAVING COUNT(*) > 1"
+        )).fetchall()
+        if clashes:
+            emails = ', '.join(row.normalized for row in clashes[:10])
+            raise RuntimeError(
+                f"{table}: {len(clashes)} emails collide once normalized ({emails}); "
+                f"merge or rename these accounts before upgrading"
+            )
+
+    for table in ACCOUNT_TABLES:
+        conn.execute(sa.text(
+            f"UPDATE {table} SET email = LOWER(TRIM(email)) "
+            f"WHERE email <> LOWER(TRIM(email))"
+        ))
+
+
+def downgrade():
+    # The original casing is not kept; normalized emails stay valid
+    pass